@@ -2,23 +2,37 @@
 # Advent of Code 2025 - Day 01 - Secret Entrance
 # Problem: See ./01-secret-entrance-description.md for full details
 # Author: Ciovino
-# Template Version: v1.0
+# Template Version: v2.2
 # ---------------------------------------------------------------------
+from __future__ import annotations
 import os
 import argparse
 import time
+import json
+import cProfile
+import pstats
+import tracemalloc
 
 # Useful imports
 import re
 from collections import defaultdict, Counter, deque
 from itertools import combinations, permutations, product
 from math import gcd, lcm, ceil, floor
+import random
+from itertools import islice
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    import numpy as np
 
 INPUT_FILE = os.path.join('data', '2025-01.in')
 TEST_FILE = os.path.join('data', 'test.in')
+STRESS_FILE = os.path.join('data', '2025-01-stress.in')
 VERBOSE = False
+PHASES = ('parse', 'part1', 'part2')
 DIAL_START = 50
 DIAL_DIM = 100
+ENGINE = 'python' # 'python' or 'numpy'
+CHUNK_SIZE = None # Moves per chunk for the numpy engine (None: whole file at once)
 
 def log(*args, **kwargs):
     if VERBOSE: # Print only if VERBOSE is enabled
@@ -28,9 +42,60 @@ def get_args() -> dict:
     parser = argparse.ArgumentParser(description="Solution script for 01/2025 Advent of Code.")
     parser.add_argument('-t', '--test', action='store_true',  help=f"Run the script using the test file ({TEST_FILE})")
     parser.add_argument('-v', '--verbose', action='store_true', help="Enable verbose output.")
+    parser.add_argument('--profile', nargs='?', const='', default=None, metavar='FILE', help="Profile each phase with cProfile. Print the top functions, or dump them to FILE_<phase>.prof")
+    parser.add_argument('--mem', action='store_true', help="Report peak memory and top allocation sites of each phase (tracemalloc).")
+    parser.add_argument('--repeat', type=int, default=1, help="Run parsing and both parts N times.")
+    parser.add_argument('--top', type=int, default=15, help="Number of entries shown by --profile and --mem.")
+    parser.add_argument('--engine', choices=['python', 'numpy'], default='python', help="Solver engine (default: python).")
+    parser.add_argument('--chunk-size', type=int, default=None, help="With --engine numpy, stream the input N moves at a time.")
+    parser.add_argument('--stress', type=int, default=None, metavar='N', help=f"Generate N random moves with distances up to 10^9 ({STRESS_FILE}) and solve them.")
     return parser.parse_args()
 
+def run_phase(phase: str, func, arg, timings: dict, profilers: dict, memory: dict | None):
+    """Run a single phase, timing it and profiling it if requested."""
+    if memory is not None:
+        tracemalloc.start()
+    profiler = profilers.get(phase)
+    if profiler is not None:
+        profiler.enable()
+    
+    start_time = time.perf_counter_ns()
+    result = func(arg)
+    timings[phase].append(time.perf_counter_ns() - start_time)
+    
+    if profiler is not None:
+        profiler.disable()
+    if memory is not None: # Keep the last repetition
+        _, peak = tracemalloc.get_traced_memory()
+        memory[phase] = (peak, tracemalloc.take_snapshot())
+        tracemalloc.stop()
+    return result
+
+def report_profile(profilers: dict, dump_name: str, top: int):
+    for phase, profiler in profilers.items():
+        if dump_name:
+            profiler.dump_stats(f"{dump_name}_{phase}.prof")
+            print(f"Profile of '{phase}' saved to {dump_name}_{phase}.prof")
+        else:
+            print(f"--- Profile: {phase} ---")
+            pstats.Stats(profiler).sort_stats('cumulative').print_stats(top)
+
+def report_memory(memory: dict, top: int):
+    ignore = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"))
+    for phase, (peak, snapshot) in memory.items():
+        print(f"--- Memory: {phase} (peak {peak / 1024:.1f} KiB) ---")
+        for stat in snapshot.filter_traces(ignore).statistics('lineno')[:top]:
+            print(stat)
+
+def format_timing(samples_ns: list[int]) -> str:
+    if len(samples_ns) == 1:
+        return f"{samples_ns[0] / 1e9:.4f}s"
+    return f"{min(samples_ns) / 1e9:.4f}s (min of {len(samples_ns)}, mean {sum(samples_ns) / len(samples_ns) / 1e9:.4f}s)"
+
 def parse_input(file_name) -> list[tuple[str, int]]:
+    if ENGINE == 'numpy':
+        return parse_input_numpy(file_name, CHUNK_SIZE)
+    
     moves: list[tuple[str, int]] = []
     with open(file_name, 'r') as f:
         for line in f:
@@ -38,9 +103,71 @@ def parse_input(file_name) -> list[tuple[str, int]]:
             moves.append((direction, distance))
     return moves
 
+def to_signed(lines: list[str]) -> np.ndarray:
+    """'R10', 'L5' -> [10, -5]"""
+    text = ''.join(lines).replace('R', '').replace('L', '-')
+    return np.array(text.split(), dtype=np.int64)
+
+class ChunkedMoves:
+    """Moves read from the file `chunk_size` at a time, as signed int64 arrays."""
+    def __init__(self, file_name: str, chunk_size: int):
+        self.file_name = file_name
+        self.chunk_size = chunk_size
+    
+    def __iter__(self):
+        with open(self.file_name, 'r') as f:
+            while lines := list(islice(f, self.chunk_size)):
+                yield to_signed(lines)
+
+def parse_input_numpy(file_name, chunk_size: int | None = None) -> np.ndarray | ChunkedMoves:
+    global np # Entry point of the numpy engine: to_signed, rotate_chunk and solve_numpy use it too
+    import numpy as np
+    if chunk_size is not None:
+        return ChunkedMoves(file_name, chunk_size) # Read lazily by the solvers
+    with open(file_name, 'r') as f:
+        return to_signed(f.readlines())
+
 # --- SOLVE ---
+def rotate_chunk(dial: int, signed: np.ndarray) -> tuple[int, int, int]:
+    """
+    Apply a chunk of moves starting from `dial`.
+    Return (moves landing on 0, clicks on 0, final dial)
+    """
+    if len(signed) == 0:
+        return 0, 0, dial
+    positions = dial + np.cumsum(signed) # Positions without the modulo
+    previous = np.concatenate(([dial], positions[:-1]))
+    
+    land_on_zero = int(np.count_nonzero(positions % DIAL_DIM == 0))
+    zero_clicks = np.where(signed > 0,
+                           positions // DIAL_DIM - previous // DIAL_DIM, # Right: multiples in (previous, position]
+                           (previous - 1) // DIAL_DIM - (positions - 1) // DIAL_DIM) # Left: multiples in [position, previous)
+    return land_on_zero, int(zero_clicks.sum()), int(positions[-1] % DIAL_DIM)
+
+def solve_numpy(moves: np.ndarray | ChunkedMoves) -> tuple[int, int]:
+    """Both answers in one pass, carrying the dial across chunks."""
+    chunks = [moves] if isinstance(moves, np.ndarray) else moves
+    dial, land_on_zero, zero_clicks = DIAL_START, 0, 0
+    for signed in chunks:
+        chunk_land, chunk_clicks, dial = rotate_chunk(dial, signed)
+        land_on_zero += chunk_land
+        zero_clicks += chunk_clicks
+    return land_on_zero, zero_clicks
+
+last_pass: tuple[np.ndarray | ChunkedMoves, tuple[int, int]] | None = None # (Moves, result of solve_numpy on them)
+
+def numpy_pass(moves: np.ndarray | ChunkedMoves) -> tuple[int, int]:
+    """solve_numpy, run once per parsed input: both parts read the same result (and chunks are read once)."""
+    global last_pass
+    if last_pass is None or last_pass[0] is not moves: # Same object, not only same content: --repeat parses again
+        last_pass = (moves, solve_numpy(moves))
+    return last_pass[1]
+
 def solve_part1(moves: list[tuple[str, int]]) -> int:
     """Solution for Part 1."""
+    if ENGINE == 'numpy':
+        return numpy_pass(moves)[0]
+    
     dial, land_on_zero = DIAL_START, 0
     
     for direction, distance in moves:
@@ -50,20 +177,34 @@ def solve_part1(moves: list[tuple[str, int]]) -> int:
     
     return land_on_zero
 
+def count_zero_clicks(dial: int, direction: str, distance: int) -> int:
+    """How many clicks of a rotation land on 0, in O(1) regardless of the distance."""
+    if direction == 'R': # Multiples of DIAL_DIM in [dial + 1, dial + distance]
+        return (dial + distance) // DIAL_DIM - dial // DIAL_DIM
+    else: # Multiples of DIAL_DIM in [dial - distance, dial - 1]
+        return (dial - 1) // DIAL_DIM - (dial - distance - 1) // DIAL_DIM
+
 def solve_part2(moves: list[tuple[str, int]]) -> int:
     """Solution for Part 2."""
+    if ENGINE == 'numpy':
+        return numpy_pass(moves)[1]
+    
     dial, zero_clicks = DIAL_START, 0
     
     for direction, distance in moves:
-        step = 1 if direction == 'R' else -1        
-        
-        for _ in range(distance):
-            dial = (dial + step) % DIAL_DIM
-            if dial == 0:
-                zero_clicks += 1
+        step = 1 if direction == 'R' else -1
+        zero_clicks += count_zero_clicks(dial, direction, distance)
+        dial = (dial + step * distance) % DIAL_DIM
     
     return zero_clicks
 
+def generate_stress_input(file_name: str, moves: int, max_distance: int = 10**9, seed: int | None = None):
+    """Write `moves` random rotations with distances up to `max_distance`."""
+    rng = random.Random(seed)
+    with open(file_name, 'w') as f:
+        for _ in range(moves):
+            f.write(f"{rng.choice('LR')}{rng.randint(1, max_distance)}\n")
+
 if __name__ == '__main__':
     args = get_args()
     if args.test:
@@ -71,25 +212,35 @@ if __name__ == '__main__':
             print(f"ERROR: Test file '{TEST_FILE}' not found.")
             exit(1)
         use_file = TEST_FILE
+    elif args.stress is not None:
+        generate_stress_input(STRESS_FILE, args.stress)
+        use_file = STRESS_FILE
     else:
         use_file = INPUT_FILE
     VERBOSE = args.verbose
+    ENGINE, CHUNK_SIZE = args.engine, args.chunk_size
+    if ENGINE == 'numpy':
+        import numpy # Pay the import here, not in the timed parse of parse_input_numpy
+    
+    timings = {phase: [] for phase in PHASES}
+    profilers = {phase: cProfile.Profile() for phase in PHASES} if args.profile is not None else {}
+    memory = {} if args.mem else None
     
-    # Parsing
-    start_time = time.time()
-    data = parse_input(use_file)
-    log(f"Input parsed in {time.time()-start_time:.4f}s")
+    for _ in range(max(1, args.repeat)): # Parse again every time: solvers may modify their data
+        data = run_phase('parse', parse_input, use_file, timings, profilers, memory)
+        sol1 = run_phase('part1', solve_part1, data, timings, profilers, memory)
+        sol2 = run_phase('part2', solve_part2, data, timings, profilers, memory)
     
-    # Part 1
-    start_time = time.time()
-    sol1 = solve_part1(data)
-    log(f"Part 1: {sol1}, took {time.time()-start_time:.4f}s")
+    log(f"Input parsed in {format_timing(timings['parse'])}")
+    log(f"Part 1: {sol1}, took {format_timing(timings['part1'])}")
+    log(f"Part 2: {sol2}, took {format_timing(timings['part2'])}")
     
-    # Part 2
-    start_time = time.time()
-    sol2 = solve_part2(data)
-    log(f"Part 2: {sol2}, took {time.time()-start_time:.4f}s")
+    if profilers:
+        report_profile(profilers, args.profile, args.top)
+    if memory is not None:
+        report_memory(memory, args.top)
 
     # --- PRINT SOLUTIONS ---
     print(f"AOC_SOL_1={sol1}")
     print(f"AOC_SOL_2={sol2}")
+    print(f"AOC_TIME={json.dumps({'parse': min(timings['parse']), 'p1': min(timings['part1']), 'p2': min(timings['part2'])})}") # Nanoseconds
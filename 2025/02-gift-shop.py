@@ -2,21 +2,30 @@
 # Advent of Code 2025 - Day 02 - Gift shop
 # Problem: See ./02-gift-shop-description.md for full details
 # Author: Ciovino
-# Template Version: v1.0
+# Template Version: v2.2
 # ---------------------------------------------------------------------
 import os
 import argparse
 import time
+import json
+import cProfile
+import pstats
+import tracemalloc
 
 # Useful imports
 import re
 from collections import defaultdict, Counter, deque
 from itertools import combinations, permutations, product
-from math import gcd, lcm, ceil, floor
+from math import gcd, lcm, ceil, floor, prod
+from concurrent.futures import ProcessPoolExecutor
 
 INPUT_FILE = os.path.join('data', '2025-02.in')
 TEST_FILE = os.path.join('data', 'test.in')
 VERBOSE = False
+PHASES = ('parse', 'part1', 'part2')
+ENGINE = 'generate' # 'generate' or 'scan'
+WORKERS = 1 # Processes used by the scan engine
+CHUNKS_PER_WORKER = 4 # More chunks than workers, so a slow chunk doesn't leave the others idle
 
 def log(*args, **kwargs):
     if VERBOSE: # Print only if VERBOSE is enabled
@@ -26,51 +35,191 @@ def get_args() -> dict:
     parser = argparse.ArgumentParser(description="Solution script for 02/2025 Advent of Code.")
     parser.add_argument('-t', '--test', action='store_true',  help=f"Run the script using the test file ({TEST_FILE})")
     parser.add_argument('-v', '--verbose', action='store_true', help="Enable verbose output.")
+    parser.add_argument('--profile', nargs='?', const='', default=None, metavar='FILE', help="Profile each phase with cProfile. Print the top functions, or dump them to FILE_<phase>.prof")
+    parser.add_argument('--mem', action='store_true', help="Report peak memory and top allocation sites of each phase (tracemalloc).")
+    parser.add_argument('--repeat', type=int, default=1, help="Run parsing and both parts N times.")
+    parser.add_argument('--top', type=int, default=15, help="Number of entries shown by --profile and --mem.")
+    parser.add_argument('--engine', choices=['generate', 'scan'], default='generate', help="Generate only the invalid IDs, or scan every ID of the ranges (default: generate).")
+    parser.add_argument('--workers', type=int, default=1, help="Processes used by the scan engine (0: one per core, default: 1). Only valid with --engine scan.")
     return parser.parse_args()
 
+def run_phase(phase: str, func, arg, timings: dict, profilers: dict, memory: dict | None):
+    """Run a single phase, timing it and profiling it if requested."""
+    if memory is not None:
+        tracemalloc.start()
+    profiler = profilers.get(phase)
+    if profiler is not None:
+        profiler.enable()
+    
+    start_time = time.perf_counter_ns()
+    result = func(arg)
+    timings[phase].append(time.perf_counter_ns() - start_time)
+    
+    if profiler is not None:
+        profiler.disable()
+    if memory is not None: # Keep the last repetition
+        _, peak = tracemalloc.get_traced_memory()
+        memory[phase] = (peak, tracemalloc.take_snapshot())
+        tracemalloc.stop()
+    return result
+
+def report_profile(profilers: dict, dump_name: str, top: int):
+    for phase, profiler in profilers.items():
+        if dump_name:
+            profiler.dump_stats(f"{dump_name}_{phase}.prof")
+            print(f"Profile of '{phase}' saved to {dump_name}_{phase}.prof")
+        else:
+            print(f"--- Profile: {phase} ---")
+            pstats.Stats(profiler).sort_stats('cumulative').print_stats(top)
+
+def report_memory(memory: dict, top: int):
+    ignore = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"))
+    for phase, (peak, snapshot) in memory.items():
+        print(f"--- Memory: {phase} (peak {peak / 1024:.1f} KiB) ---")
+        for stat in snapshot.filter_traces(ignore).statistics('lineno')[:top]:
+            print(stat)
+
+def format_timing(samples_ns: list[int]) -> str:
+    if len(samples_ns) == 1:
+        return f"{samples_ns[0] / 1e9:.4f}s"
+    return f"{min(samples_ns) / 1e9:.4f}s (min of {len(samples_ns)}, mean {sum(samples_ns) / len(samples_ns) / 1e9:.4f}s)"
+
 def parse_input(file_name) -> list[str]:
     with open(file_name, 'r') as f:
         data = f.readline().strip()
     return data.split(',')
 
 # --- SOLVE ---
+def double_sequence(id: int) -> int:
+    id_str = str(id)
+    if len(id_str) % 2 != 0:
+        return False
+    
+    mid_point = len(id_str) // 2
+    first_half, second_half = id_str[:mid_point], id_str[mid_point:]
+    return id if first_half == second_half else 0
+
+def repeated_sequence(id: int) -> int:
+    id_str = str(id)
+    len_id = len(id_str)
+    
+    for sequence_length in range(1, len_id//2 + 1):
+        if len_id % sequence_length != 0: continue
+        sequence = id_str[:sequence_length]
+        if id_str.count(sequence) * sequence_length == len_id:
+            return id
+    return 0
+
+def scan_range(first_id: int, last_id: int, is_invalid) -> int:
+    """Check every ID of the range: linear in its width."""
+    return sum(is_invalid(id) for id in range(first_id, last_id + 1))
+
+def split_in_chunks(id_ranges: list[tuple[int, int]], chunks: int) -> list[tuple[int, int]]:
+    """Split the ranges in about `chunks` pieces with the same width (wide ranges are subdivided)."""
+    total_width = sum(last_id - first_id + 1 for first_id, last_id in id_ranges)
+    chunk_width = max(1, -(-total_width // chunks))
+    
+    pieces: list[tuple[int, int]] = []
+    for first_id, last_id in id_ranges:
+        for start in range(first_id, last_id + 1, chunk_width):
+            pieces.append((start, min(last_id, start + chunk_width - 1)))
+    pieces.sort(key=lambda piece: piece[1] - piece[0], reverse=True) # Widest first
+    return pieces
+
+def scan_chunk(chunk: tuple[int, int, object]) -> int:
+    first_id, last_id, is_invalid = chunk
+    return scan_range(first_id, last_id, is_invalid)
+
+def scan_parallel(id_ranges: list[tuple[int, int]], is_invalid, workers: int) -> int:
+    """Scan the ranges on a process pool and add up the partial sums."""
+    chunks = split_in_chunks(id_ranges, workers * CHUNKS_PER_WORKER)
+    log(f"Scanning {len(chunks)} chunks on {workers} processes")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return sum(executor.map(scan_chunk, [(first_id, last_id, is_invalid) for first_id, last_id in chunks]))
+
+def split_by_length(first_id: int, last_id: int) -> list[tuple[int, int, int]]:
+    """Split a range in sub-ranges of IDs with the same number of digits: [(length, first, last)]"""
+    sections: list[tuple[int, int, int]] = []
+    for length in range(len(str(first_id)), len(str(last_id)) + 1):
+        first = max(first_id, 10**(length - 1))
+        last = min(last_id, 10**length - 1)
+        if first <= last:
+            sections.append((length, first, last))
+    return sections
+
+def repeated_sum(first_id: int, last_id: int, length: int, pattern_length: int) -> int:
+    """
+    Sum of the IDs in [first_id, last_id] (all with `length` digits) made of a `pattern_length` digits pattern repeated.
+    Every such ID is pattern * 10..010..01, so the patterns in the range are consecutive: arithmetic series
+    """
+    repeat_unit = (10**length - 1) // (10**pattern_length - 1) # e.g. length 6, pattern 2 -> 10101
+    lowest = max(10**(pattern_length - 1), -(-first_id // repeat_unit)) # No leading zeros, ceil division
+    highest = min(10**pattern_length - 1, last_id // repeat_unit)
+    if lowest > highest:
+        return 0
+    return repeat_unit * (lowest + highest) * (highest - lowest + 1) // 2
+
+def prime_factors(n: int) -> list[int]:
+    factors: list[int] = []
+    p = 2
+    while p * p <= n:
+        if n % p == 0:
+            factors.append(p)
+            while n % p == 0:
+                n //= p
+        p += 1
+    if n > 1:
+        factors.append(n)
+    return factors
+
+def generate_range(first_id: int, last_id: int, any_repetition: bool) -> int:
+    """
+    Sum of the invalid IDs of the range, without looking at every ID: cost depends on the number of digits only.
+    An ID of L digits repeating a pattern has period L/q for some prime q dividing L: the periods are combined
+    with inclusion-exclusion, so IDs like 111111 (periods 1, 2 and 3) are counted once
+    """
+    invalid_ids = 0
+    for length, first, last in split_by_length(first_id, last_id):
+        if not any_repetition: # Part 1: exactly two repetitions
+            if length % 2 == 0:
+                invalid_ids += repeated_sum(first, last, length, length // 2)
+            continue
+        
+        primes = prime_factors(length)
+        for size in range(1, len(primes) + 1):
+            for subset in combinations(primes, size):
+                sign = 1 if size % 2 == 1 else -1
+                invalid_ids += sign * repeated_sum(first, last, length, length // prod(subset))
+    return invalid_ids
+
+def parse_ranges(id_ranges: list[str]) -> list[tuple[int, int]]:
+    return [tuple(map(int, id_range.split('-'))) for id_range in id_ranges]
+
 def solve_part1(id_ranges: list[str]):
     """Solution for Part 1."""
-    def double_sequence(id: int) -> int:
-        id_str = str(id)
-        if len(id_str) % 2 != 0:
-            return False
-        
-        mid_point = len(id_str) // 2
-        first_half, second_half = id_str[:mid_point], id_str[mid_point:]
-        return id if first_half == second_half else 0
+    if ENGINE == 'scan' and WORKERS > 1:
+        return scan_parallel(parse_ranges(id_ranges), double_sequence, WORKERS)
     
     invalid_ids: int = 0
-    for id_range in id_ranges:
-        first_id, last_id = tuple(map(int, id_range.split('-')))
-        for id in range(first_id, last_id + 1):
-            invalid_ids += double_sequence(id)
+    for first_id, last_id in parse_ranges(id_ranges):
+        if ENGINE == 'scan':
+            invalid_ids += scan_range(first_id, last_id, double_sequence)
+        else:
+            invalid_ids += generate_range(first_id, last_id, any_repetition=False)
 
     return invalid_ids
 
 def solve_part2(id_ranges: list[str]):
     """Solution for Part 2."""
-    def repeated_sequence(id: int) -> int:
-        id_str = str(id)
-        len_id = len(id_str)
-        
-        for sequence_length in range(1, len_id//2 + 1):
-            if len_id % sequence_length != 0: continue
-            sequence = id_str[:sequence_length]
-            if id_str.count(sequence) * sequence_length == len_id:
-                return id
-        return 0
+    if ENGINE == 'scan' and WORKERS > 1:
+        return scan_parallel(parse_ranges(id_ranges), repeated_sequence, WORKERS)
     
     invalid_ids: int = 0
-    for id_range in id_ranges:
-        first_id, last_id = tuple(map(int, id_range.split('-')))
-        for id in range(first_id, last_id + 1):
-            invalid_ids += repeated_sequence(id)
+    for first_id, last_id in parse_ranges(id_ranges):
+        if ENGINE == 'scan':
+            invalid_ids += scan_range(first_id, last_id, repeated_sequence)
+        else:
+            invalid_ids += generate_range(first_id, last_id, any_repetition=True)
 
     return invalid_ids
 
@@ -84,22 +233,31 @@ if __name__ == '__main__':
     else:
         use_file = INPUT_FILE
     VERBOSE = args.verbose
+    ENGINE = args.engine
+    if args.workers != 1 and ENGINE != 'scan':
+        print(f"ERROR: --workers is only used by --engine scan (engine: {ENGINE}).")
+        exit(1)
+    WORKERS = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    
+    timings = {phase: [] for phase in PHASES}
+    profilers = {phase: cProfile.Profile() for phase in PHASES} if args.profile is not None else {}
+    memory = {} if args.mem else None
     
-    # Parsing
-    start_time = time.time()
-    data = parse_input(use_file)
-    log(f"Input parsed in {time.time()-start_time:.4f}s")
+    for _ in range(max(1, args.repeat)): # Parse again every time: solvers may modify their data
+        data = run_phase('parse', parse_input, use_file, timings, profilers, memory)
+        sol1 = run_phase('part1', solve_part1, data, timings, profilers, memory)
+        sol2 = run_phase('part2', solve_part2, data, timings, profilers, memory)
     
-    # Part 1
-    start_time = time.time()
-    sol1 = solve_part1(data)
-    log(f"Part 1: {sol1}, took {time.time()-start_time:.4f}s")
+    log(f"Input parsed in {format_timing(timings['parse'])}")
+    log(f"Part 1: {sol1}, took {format_timing(timings['part1'])}")
+    log(f"Part 2: {sol2}, took {format_timing(timings['part2'])}")
     
-    # Part 2
-    start_time = time.time()
-    sol2 = solve_part2(data)
-    log(f"Part 2: {sol2}, took {time.time()-start_time:.4f}s")
+    if profilers:
+        report_profile(profilers, args.profile, args.top)
+    if memory is not None:
+        report_memory(memory, args.top)
 
     # --- PRINT SOLUTIONS ---
     print(f"AOC_SOL_1={sol1}")
     print(f"AOC_SOL_2={sol2}")
+    print(f"AOC_TIME={json.dumps({'parse': min(timings['parse']), 'p1': min(timings['part1']), 'p2': min(timings['part2'])})}") # Nanoseconds
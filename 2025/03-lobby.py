@@ -2,21 +2,32 @@
 # Advent of Code 2025 - Day 03 - Lobby
 # Problem: See .\2025\03-lobby-description.md for full details
 # Author: Ciovino
-# Template Version: v1.0
+# Template Version: v2.2
 # ---------------------------------------------------------------------
+from __future__ import annotations
 import os
 import argparse
 import time
+import json
+import cProfile
+import pstats
+import tracemalloc
 
 # Useful imports
 import re
 from collections import defaultdict, Counter, deque
 from itertools import combinations, permutations, product
 from math import gcd, lcm, ceil, floor
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    import numpy as np
 
 INPUT_FILE = os.path.join('data', '2025-03.in')
 TEST_FILE = os.path.join('data', 'test.in')
 VERBOSE = False
+PHASES = ('parse', 'part1', 'part2')
+ENGINE = 'stack' # 'stack' (one bank at a time) or 'numpy' (all banks at once)
+MAX_BATCH_DIGITS = 18 # Joltages with more digits don't fit in an int64
 
 def log(*args, **kwargs):
     if VERBOSE: # Print only if VERBOSE is enabled
@@ -26,41 +37,138 @@ def get_args() -> dict:
     parser = argparse.ArgumentParser(description="Solution script for 03/2025 Advent of Code.")
     parser.add_argument('-t', '--test', action='store_true',  help=f"Run the script using the test file ({TEST_FILE})")
     parser.add_argument('-v', '--verbose', action='store_true', help="Enable verbose output.")
+    parser.add_argument('--profile', nargs='?', const='', default=None, metavar='FILE', help="Profile each phase with cProfile. Print the top functions, or dump them to FILE_<phase>.prof")
+    parser.add_argument('--mem', action='store_true', help="Report peak memory and top allocation sites of each phase (tracemalloc).")
+    parser.add_argument('--repeat', type=int, default=1, help="Run parsing and both parts N times.")
+    parser.add_argument('--top', type=int, default=15, help="Number of entries shown by --profile and --mem.")
+    parser.add_argument('--engine', choices=['stack', 'numpy'], default='stack', help="Solve one bank at a time, or all the banks at once with NumPy (default: stack).")
     return parser.parse_args()
 
-def parse_input(file_name) -> list[list[str]]:
-    data: list[list[str]] = []
-    with open(file_name, 'r') as f:
+def run_phase(phase: str, func, arg, timings: dict, profilers: dict, memory: dict | None):
+    """Run a single phase, timing it and profiling it if requested."""
+    if memory is not None:
+        tracemalloc.start()
+    profiler = profilers.get(phase)
+    if profiler is not None:
+        profiler.enable()
+    
+    start_time = time.perf_counter_ns()
+    result = func(arg)
+    timings[phase].append(time.perf_counter_ns() - start_time)
+    
+    if profiler is not None:
+        profiler.disable()
+    if memory is not None: # Keep the last repetition
+        _, peak = tracemalloc.get_traced_memory()
+        memory[phase] = (peak, tracemalloc.take_snapshot())
+        tracemalloc.stop()
+    return result
+
+def report_profile(profilers: dict, dump_name: str, top: int):
+    for phase, profiler in profilers.items():
+        if dump_name:
+            profiler.dump_stats(f"{dump_name}_{phase}.prof")
+            print(f"Profile of '{phase}' saved to {dump_name}_{phase}.prof")
+        else:
+            print(f"--- Profile: {phase} ---")
+            pstats.Stats(profiler).sort_stats('cumulative').print_stats(top)
+
+def report_memory(memory: dict, top: int):
+    ignore = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"))
+    for phase, (peak, snapshot) in memory.items():
+        print(f"--- Memory: {phase} (peak {peak / 1024:.1f} KiB) ---")
+        for stat in snapshot.filter_traces(ignore).statistics('lineno')[:top]:
+            print(stat)
+
+def format_timing(samples_ns: list[int]) -> str:
+    if len(samples_ns) == 1:
+        return f"{samples_ns[0] / 1e9:.4f}s"
+    return f"{min(samples_ns) / 1e9:.4f}s (min of {len(samples_ns)}, mean {sum(samples_ns) / len(samples_ns) / 1e9:.4f}s)"
+
+def parse_input(file_name) -> list[bytes]:
+    if ENGINE == 'numpy':
+        return parse_input_numpy(file_name)
+    
+    data: list[bytes] = []
+    with open(file_name, 'rb') as f:
         for line in f:
-            data.append(list(line.strip()))
+            data.append(line.strip())
     return data
 
+def parse_input_numpy(file_name) -> tuple[np.ndarray, np.ndarray]:
+    """All the banks in a (banks x batteries) uint8 matrix of digits, padded with 0, plus the length of every bank."""
+    global np # Entry point of the numpy engine, compute_max_joltage_batch uses it too
+    import numpy as np
+    with open(file_name, 'rb') as f:
+        banks = f.read().split()
+    lengths = np.array([len(bank) for bank in banks], dtype=np.int64)
+    width = int(lengths.max()) if len(banks) else 0
+    
+    if np.all(lengths == width): # Same length: a single buffer, no copy per row
+        matrix = np.frombuffer(b''.join(banks), dtype=np.uint8).reshape(len(banks), width) - ord('0')
+    else:
+        matrix = np.zeros((len(banks), width), dtype=np.uint8)
+        for r, bank in enumerate(banks):
+            matrix[r, :len(bank)] = np.frombuffer(bank, dtype=np.uint8) - ord('0')
+    return matrix, lengths
+
 # --- SOLVE ---
-def compute_max_joltage(bank: list[str], N: int) -> int:
+def compute_max_joltage(bank: bytes, N: int) -> int:
+    """
+    Largest N digits subsequence of the bank, with a monotonic stack in O(len(bank)).
+    A digit pops the smaller ones before it, as long as enough digits are left to reach N
+    """
     if N > len(bank):
         raise ValueError(f"Can't compute joltage with {N} batteries from a bank with {len(bank)} batteries. Battery bank: {bank}")
     
-    max_joltage = ''
-    start_position = 0
+    to_drop = len(bank) - N # Batteries that can still be skipped
+    chosen = bytearray()
+    for battery in bank:
+        while to_drop and chosen and chosen[-1] < battery:
+            chosen.pop()
+            to_drop -= 1
+        chosen.append(battery)
+    return int(chosen[:N])
+
+def compute_max_joltage_batch(matrix: np.ndarray, lengths: np.ndarray, N: int) -> int:
+    """
+    Same greedy choice as compute_max_joltage, for every bank at once: at step i each row picks
+    the leftmost max of its window [start, length - N + i], with a single argmax over the masked matrix
+    """
+    if N > MAX_BATCH_DIGITS:
+        banks = [bytes(row[:length] + ord('0')) for row, length in zip(matrix, lengths)]
+        return sum(compute_max_joltage(bank, N) for bank in banks)
+    if np.any(lengths < N):
+        raise ValueError(f"Can't compute joltage with {N} batteries from a bank with {int(lengths.min())} batteries.")
+    
+    rows = np.arange(matrix.shape[0])
+    columns = np.arange(matrix.shape[1])
+    start = np.zeros(matrix.shape[0], dtype=np.int64)
+    joltage = np.zeros(matrix.shape[0], dtype=np.int64)
+    uniform = bool(np.all(lengths == matrix.shape[1])) # No padding: the window end is the same for every row
     
     for i in range(N):
-        end_position = -N + i + 1
-        if end_position != 0:
-            bank_current_section = bank[start_position:(-N+i+1)]
-        else:
-            bank_current_section = bank[start_position:]
-        chosen_battery = max(bank_current_section)
-        start_position += 1 + bank_current_section.index(chosen_battery)
-        max_joltage += chosen_battery
-    return int(max_joltage)
+        end = lengths - N + i # Last battery that still leaves enough batteries after it
+        first, last = int(start.min()), int(end.max()) + 1 # Only the columns inside some window
+        window = columns[first:last] >= start[:, None]
+        if not uniform:
+            window &= columns[first:last] <= end[:, None]
+        chosen = first + np.argmax(matrix[:, first:last] * window, axis=1) # Digits are >= 1, so the max is inside the window
+        joltage = joltage * 10 + matrix[rows, chosen]
+        start = chosen + 1
+    return sum(joltage.tolist()) # Python ints: the total may not fit in an int64
 
-def solve_part1(battery_banks: list[list[str]]) -> int:
+def solve_part1(battery_banks: list[bytes]) -> int:
     """Solution for Part 1."""
-    return sum(list(map(lambda bank: compute_max_joltage(bank, 2), battery_banks)))
+    if ENGINE == 'numpy':
+        return compute_max_joltage_batch(*battery_banks, 2)
+    return sum(compute_max_joltage(bank, 2) for bank in battery_banks)
 
-def solve_part2(battery_banks: list[list[str]]) -> int:
+def solve_part2(battery_banks: list[bytes]) -> int:
     """Solution for Part 2."""
-    return sum(list(map(lambda bank: compute_max_joltage(bank, 12), battery_banks)))
+    if ENGINE == 'numpy':
+        return compute_max_joltage_batch(*battery_banks, 12)
+    return sum(compute_max_joltage(bank, 12) for bank in battery_banks)
 
 if __name__ == '__main__':
     args = get_args()
@@ -72,22 +180,29 @@ if __name__ == '__main__':
     else:
         use_file = INPUT_FILE
     VERBOSE = args.verbose
+    ENGINE = args.engine
+    if ENGINE == 'numpy':
+        import numpy # Already loaded when parse_input_numpy binds it, so parsing is timed without the import
+    
+    timings = {phase: [] for phase in PHASES}
+    profilers = {phase: cProfile.Profile() for phase in PHASES} if args.profile is not None else {}
+    memory = {} if args.mem else None
     
-    # Parsing
-    start_time = time.time()
-    data = parse_input(use_file)
-    log(f"Input parsed in {time.time()-start_time:.4f}s")
+    for _ in range(max(1, args.repeat)): # Parse again every time: solvers may modify their data
+        data = run_phase('parse', parse_input, use_file, timings, profilers, memory)
+        sol1 = run_phase('part1', solve_part1, data, timings, profilers, memory)
+        sol2 = run_phase('part2', solve_part2, data, timings, profilers, memory)
     
-    # Part 1
-    start_time = time.time()
-    sol1 = solve_part1(data)
-    log(f"Part 1: {sol1}, took {time.time()-start_time:.4f}s")
+    log(f"Input parsed in {format_timing(timings['parse'])}")
+    log(f"Part 1: {sol1}, took {format_timing(timings['part1'])}")
+    log(f"Part 2: {sol2}, took {format_timing(timings['part2'])}")
     
-    # Part 2
-    start_time = time.time()
-    sol2 = solve_part2(data)
-    log(f"Part 2: {sol2}, took {time.time()-start_time:.4f}s")
+    if profilers:
+        report_profile(profilers, args.profile, args.top)
+    if memory is not None:
+        report_memory(memory, args.top)
 
     # --- PRINT SOLUTIONS ---
     print(f"AOC_SOL_1={sol1}")
     print(f"AOC_SOL_2={sol2}")
+    print(f"AOC_TIME={json.dumps({'parse': min(timings['parse']), 'p1': min(timings['part1']), 'p2': min(timings['part2'])})}") # Nanoseconds
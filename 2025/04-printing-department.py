@@ -2,21 +2,33 @@
 # Advent of Code 2025 - Day 04 - Printing Department
 # Problem: See .\2025\04-printing-department-description.md for full details
 # Author: Ciovino
-# Template Version: v1.0
+# Template Version: v2.2
 # ---------------------------------------------------------------------
+from __future__ import annotations
 import os
 import argparse
 import time
+import json
+import cProfile
+import pstats
+import tracemalloc
 
 # Useful imports
 import re
 from collections import defaultdict, Counter, deque
 from itertools import combinations, permutations, product
 from math import gcd, lcm, ceil, floor
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    import numpy as np
 
 INPUT_FILE = os.path.join('data', '2025-04.in')
 TEST_FILE = os.path.join('data', 'test.in')
 VERBOSE = False
+PHASES = ('parse', 'part1', 'part2')
+ENGINE = 'python' # 'python', 'numpy' or 'bitset'
+PEEL = 'worklist' # Part 2: 'worklist' (incremental) or 'sweep' (rescan the grid until nothing changes)
+NEIGHBORS = [(dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1) if (dr, dc) != (0, 0)]
 
 def log(*args, **kwargs):
     if VERBOSE: # Print only if VERBOSE is enabled
@@ -26,17 +38,93 @@ def get_args() -> dict:
     parser = argparse.ArgumentParser(description="Solution script for 04/2025 Advent of Code.")
     parser.add_argument('-t', '--test', action='store_true',  help=f"Run the script using the test file ({TEST_FILE})")
     parser.add_argument('-v', '--verbose', action='store_true', help="Enable verbose output.")
+    parser.add_argument('--profile', nargs='?', const='', default=None, metavar='FILE', help="Profile each phase with cProfile. Print the top functions, or dump them to FILE_<phase>.prof")
+    parser.add_argument('--mem', action='store_true', help="Report peak memory and top allocation sites of each phase (tracemalloc).")
+    parser.add_argument('--repeat', type=int, default=1, help="Run parsing and both parts N times.")
+    parser.add_argument('--top', type=int, default=15, help="Number of entries shown by --profile and --mem.")
+    parser.add_argument('--engine', choices=['python', 'numpy', 'bitset'], default='python', help="Solver engine (default: python).")
+    parser.add_argument('--peel', choices=['worklist', 'sweep'], default='worklist', help="Part 2: update only the neighbors of removed rolls, or rescan the grid (default: worklist).")
     return parser.parse_args()
 
+def run_phase(phase: str, func, arg, timings: dict, profilers: dict, memory: dict | None):
+    """Run a single phase, timing it and profiling it if requested."""
+    if memory is not None:
+        tracemalloc.start()
+    profiler = profilers.get(phase)
+    if profiler is not None:
+        profiler.enable()
+    
+    start_time = time.perf_counter_ns()
+    result = func(arg)
+    timings[phase].append(time.perf_counter_ns() - start_time)
+    
+    if profiler is not None:
+        profiler.disable()
+    if memory is not None: # Keep the last repetition
+        _, peak = tracemalloc.get_traced_memory()
+        memory[phase] = (peak, tracemalloc.take_snapshot())
+        tracemalloc.stop()
+    return result
+
+def report_profile(profilers: dict, dump_name: str, top: int):
+    for phase, profiler in profilers.items():
+        if dump_name:
+            profiler.dump_stats(f"{dump_name}_{phase}.prof")
+            print(f"Profile of '{phase}' saved to {dump_name}_{phase}.prof")
+        else:
+            print(f"--- Profile: {phase} ---")
+            pstats.Stats(profiler).sort_stats('cumulative').print_stats(top)
+
+def report_memory(memory: dict, top: int):
+    ignore = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"))
+    for phase, (peak, snapshot) in memory.items():
+        print(f"--- Memory: {phase} (peak {peak / 1024:.1f} KiB) ---")
+        for stat in snapshot.filter_traces(ignore).statistics('lineno')[:top]:
+            print(stat)
+
+def format_timing(samples_ns: list[int]) -> str:
+    if len(samples_ns) == 1:
+        return f"{samples_ns[0] / 1e9:.4f}s"
+    return f"{min(samples_ns) / 1e9:.4f}s (min of {len(samples_ns)}, mean {sum(samples_ns) / len(samples_ns) / 1e9:.4f}s)"
+
 def parse_input(file_name) -> list[list[str]]:
+    if ENGINE == 'numpy':
+        return parse_input_numpy(file_name)
+    if ENGINE == 'bitset':
+        return parse_input_bitset(file_name)
+    
     data: list[list[str]] = []
     with open(file_name, 'r') as f:
         for line in f:
             data.append(list(line.strip()))
     return data
 
+def parse_input_numpy(file_name) -> np.ndarray:
+    """The grid as a boolean array, True where there's a roll."""
+    global np # Bound for count_neighbors, worklist_start_numpy and solve_part2_numpy as well
+    import numpy as np
+    with open(file_name, 'rb') as f:
+        lines = f.read().split()
+    return (np.frombuffer(b''.join(lines), dtype=np.uint8) == ord('@')).reshape(len(lines), len(lines[0]))
+
+def parse_input_bitset(file_name) -> tuple[list[int], int]:
+    """Every row as an int, bit c set if there's a roll in column c. Return the rows and the width."""
+    to_bits = bytes.maketrans(b'@.', b'10')
+    with open(file_name, 'rb') as f:
+        lines = f.read().split()
+    return [int(line[::-1].translate(to_bits), 2) for line in lines], len(lines[0])
+
 # --- SOLVE ---
-def can_be_accessed(paper_rolls: list[list[str]], r: int, c: int) -> bool:
+def count_neighbors(rolls: np.ndarray) -> np.ndarray:
+    """Number of rolls among the 8 neighbors of every cell, as a sum of 8 shifted copies of the grid."""
+    ROWS, COLUMNS = rolls.shape
+    padded = np.pad(rolls, 1).view(np.uint8) # Border of empty cells, so no bounds checks
+    counts = np.zeros((ROWS, COLUMNS), dtype=np.uint8)
+    for dr, dc in NEIGHBORS:
+        counts += padded[1 + dr:1 + dr + ROWS, 1 + dc:1 + dc + COLUMNS]
+    return counts
+
+def count_roll_neighbors(paper_rolls: list[list[str]], r: int, c: int) -> int:
     neighbors_paper_rolls = 0
     for i in [-1, 0, 1]: # [Previous, Same, Next] Row
         row_index = r + i
@@ -52,11 +140,19 @@ def can_be_accessed(paper_rolls: list[list[str]], r: int, c: int) -> bool:
             
             if paper_rolls[row_index][col_index] == '@':
                 neighbors_paper_rolls += 1
-    
-    return neighbors_paper_rolls < 4 # Remove if it has less than 4 roll neighbors
+    return neighbors_paper_rolls
+
+def can_be_accessed(paper_rolls: list[list[str]], r: int, c: int) -> bool:
+    return count_roll_neighbors(paper_rolls, r, c) < 4 # Remove if it has less than 4 roll neighbors
 
 def solve_part1(paper_rolls: list[list[str]]) -> int:
     """Solution for Part 1."""
+    if ENGINE == 'bitset':
+        rows, width = paper_rolls
+        return sum(accessible_row(rows, r, (1 << width) - 1).bit_count() for r in range(len(rows)))
+    if ENGINE == 'numpy':
+        return int(np.count_nonzero(paper_rolls & (count_neighbors(paper_rolls) < 4)))
+    
     ROWS, COLUMNS = len(paper_rolls), len(paper_rolls[0])
     
     removed: int = 0
@@ -69,6 +165,17 @@ def solve_part1(paper_rolls: list[list[str]]) -> int:
 
 def solve_part2(paper_rolls: list[list[str]]) -> int:
     """Solution for Part 2."""
+    if ENGINE == 'bitset':
+        return peel_bitset(*paper_rolls)
+    if PEEL == 'worklist':
+        start = worklist_start_numpy(paper_rolls) if ENGINE == 'numpy' else worklist_start(paper_rolls)
+        removed, waves = peel_worklist(*start)
+        for i, wave in enumerate(waves):
+            log(f"Wave {i + 1}: removed {wave} rolls")
+        return removed
+    if ENGINE == 'numpy':
+        return solve_part2_numpy(paper_rolls)
+    
     ROWS, COLUMNS = len(paper_rolls), len(paper_rolls[0])
     
     removed: int = 0
@@ -88,6 +195,103 @@ def solve_part2(paper_rolls: list[list[str]]) -> int:
 
     return removed
 
+def accessible_row(rows: list[int], r: int, mask: int) -> int:
+    """
+    Bitmask of the rolls of row r with less than 4 neighbors. The 8 neighbor masks are added
+    with bitwise adders on a per-column counter (bits b0, b1 and a saturating 'at least 4' bit)
+    """
+    above = rows[r - 1] if r > 0 else 0
+    below = rows[r + 1] if r + 1 < len(rows) else 0
+    row = rows[r]
+    
+    b0 = b1 = at_least_4 = 0
+    for neighbors in (above << 1, above, above >> 1, row << 1, row >> 1, below << 1, below, below >> 1):
+        carry_0 = b0 & neighbors
+        b0 ^= neighbors
+        carry_1 = b1 & carry_0
+        b1 ^= carry_0
+        at_least_4 |= carry_1
+    return row & ~at_least_4 & mask
+
+def peel_bitset(rows: list[int], width: int) -> int:
+    """Part 2 on the bitset rows: every wave recomputes only the rows next to the ones that changed."""
+    rows = rows.copy()
+    mask = (1 << width) - 1
+    removed: int = 0
+    dirty = set(range(len(rows)))
+    while dirty:
+        to_be_removed = {r: accessible_row(rows, r, mask) for r in dirty}
+        dirty = set()
+        for r, accessible in to_be_removed.items():
+            if accessible:
+                removed += accessible.bit_count()
+                rows[r] &= ~accessible
+                dirty.update(n for n in (r - 1, r, r + 1) if 0 <= n < len(rows))
+    return removed
+
+def solve_part2_numpy(paper_rolls: np.ndarray) -> int:
+    """Same sweeps as solve_part2, each one as a whole-grid operation."""
+    rolls = paper_rolls.copy()
+    removed: int = 0
+    while True:
+        to_be_removed = rolls & (count_neighbors(rolls) < 4)
+        wave = int(np.count_nonzero(to_be_removed))
+        if wave == 0:
+            break
+        removed += wave
+        rolls &= ~to_be_removed
+    return removed
+
+def worklist_start(paper_rolls: list[list[str]]) -> tuple[bytearray, list[int], int]:
+    """
+    Starting point of peel_worklist: the grid with a border of empty cells, flattened.
+    Return the cell states (0: empty, 1: roll), the neighbor count of every roll and the padded width
+    """
+    ROWS, COLUMNS = len(paper_rolls), len(paper_rolls[0])
+    WIDTH = COLUMNS + 2
+    state = bytearray((ROWS + 2) * WIDTH)
+    counts: list[int] = [0] * len(state)
+    for r in range(ROWS):
+        for c in range(COLUMNS):
+            if paper_rolls[r][c] == '@':
+                state[(r + 1) * WIDTH + c + 1] = 1
+                counts[(r + 1) * WIDTH + c + 1] = count_roll_neighbors(paper_rolls, r, c)
+    return state, counts, WIDTH
+
+def worklist_start_numpy(paper_rolls: np.ndarray) -> tuple[bytearray, list[int], int]:
+    """Same as worklist_start, with the neighbor counts of count_neighbors."""
+    rolls = np.pad(paper_rolls, 1) # Border of empty cells: every neighbor index is valid
+    return bytearray(rolls.ravel().view(np.uint8)), count_neighbors(rolls).ravel().tolist(), rolls.shape[1]
+
+def peel_worklist(state: bytearray, counts: list[int], width: int) -> tuple[int, list[int]]:
+    """
+    Remove the accessible rolls until none is left, in time linear in the number of rolls.
+    Neighbor counts are computed once: removing a roll only decrements its 8 neighbors, and a
+    neighbor going under 4 joins the next wave. The waves are the same as the sweeps of solve_part2.
+    Return the removed rolls and the size of every wave
+    """
+    offsets = [dr * width + dc for dr, dc in NEIGHBORS]
+    wave: list[int] = [i for i, roll in enumerate(state) if roll == 1 and counts[i] < 4]
+    for i in wave:
+        state[i] = 2 # Removed (or in the next wave)
+    
+    removed: int = 0
+    waves: list[int] = []
+    while wave:
+        removed += len(wave)
+        waves.append(len(wave))
+        next_wave: list[int] = []
+        for i in wave:
+            for offset in offsets:
+                j = i + offset
+                if state[j] == 1:
+                    counts[j] -= 1
+                    if counts[j] < 4:
+                        state[j] = 2
+                        next_wave.append(j)
+        wave = next_wave
+    return removed, waves
+
 if __name__ == '__main__':
     args = get_args()
     if args.test:
@@ -98,22 +302,29 @@ if __name__ == '__main__':
     else:
         use_file = INPUT_FILE
     VERBOSE = args.verbose
+    ENGINE, PEEL = args.engine, args.peel
+    if ENGINE == 'numpy':
+        import numpy # So that the first parse_input_numpy is not timed with the import
+    
+    timings = {phase: [] for phase in PHASES}
+    profilers = {phase: cProfile.Profile() for phase in PHASES} if args.profile is not None else {}
+    memory = {} if args.mem else None
     
-    # Parsing
-    start_time = time.time()
-    data = parse_input(use_file)
-    log(f"Input parsed in {time.time()-start_time:.4f}s")
+    for _ in range(max(1, args.repeat)): # Parse again every time: solvers may modify their data
+        data = run_phase('parse', parse_input, use_file, timings, profilers, memory)
+        sol1 = run_phase('part1', solve_part1, data, timings, profilers, memory)
+        sol2 = run_phase('part2', solve_part2, data, timings, profilers, memory)
     
-    # Part 1
-    start_time = time.time()
-    sol1 = solve_part1(data)
-    log(f"Part 1: {sol1}, took {time.time()-start_time:.4f}s")
+    log(f"Input parsed in {format_timing(timings['parse'])}")
+    log(f"Part 1: {sol1}, took {format_timing(timings['part1'])}")
+    log(f"Part 2: {sol2}, took {format_timing(timings['part2'])}")
     
-    # Part 2
-    start_time = time.time()
-    sol2 = solve_part2(data)
-    log(f"Part 2: {sol2}, took {time.time()-start_time:.4f}s")
+    if profilers:
+        report_profile(profilers, args.profile, args.top)
+    if memory is not None:
+        report_memory(memory, args.top)
 
     # --- PRINT SOLUTIONS ---
     print(f"AOC_SOL_1={sol1}")
     print(f"AOC_SOL_2={sol2}")
+    print(f"AOC_TIME={json.dumps({'parse': min(timings['parse']), 'p1': min(timings['part1']), 'p2': min(timings['part2'])})}") # Nanoseconds
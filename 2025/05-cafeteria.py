@@ -2,21 +2,38 @@
 # Advent of Code 2025 - Day 05 - Cafeteria
 # Problem: See .\2025/05-cafeteria-description.md for full details
 # Author: Ciovino
-# Template Version: v1.0
+# Template Version: v2.2
 # ---------------------------------------------------------------------
+from __future__ import annotations
 import os
+import sys
 import argparse
 import time
+import json
+import cProfile
+import pstats
+import tracemalloc
+import hashlib
+import shutil
+import tempfile
 
 # Useful imports
 import re
 from collections import defaultdict, Counter, deque
-from itertools import combinations, permutations, product
+from itertools import combinations, permutations, product, islice
 from math import gcd, lcm, ceil, floor
+from bisect import bisect_right
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    import numpy as np
 
 INPUT_FILE = os.path.join('data', '2025-05.in')
 TEST_FILE = os.path.join('data', 'test.in')
 VERBOSE = False
+PHASES = ('parse', 'part1', 'part2')
+ENGINE = 'bisect' # 'bisect' (one query at a time) or 'numpy' (all queries at once)
+STREAM = None # None: read everything in memory. Otherwise the file with the ingredients to stream ('-': stdin)
+BATCH_SIZE = 100_000 # Ingredients per batch in stream mode
 
 def log(*args, **kwargs):
     if VERBOSE: # Print only if VERBOSE is enabled
@@ -26,9 +43,60 @@ def get_args() -> dict:
     parser = argparse.ArgumentParser(description="Solution script for 05/2025 Advent of Code.")
     parser.add_argument('-t', '--test', action='store_true',  help=f"Run the script using the test file ({TEST_FILE})")
     parser.add_argument('-v', '--verbose', action='store_true', help="Enable verbose output.")
+    parser.add_argument('--profile', nargs='?', const='', default=None, metavar='FILE', help="Profile each phase with cProfile. Print the top functions, or dump them to FILE_<phase>.prof")
+    parser.add_argument('--mem', action='store_true', help="Report peak memory and top allocation sites of each phase (tracemalloc).")
+    parser.add_argument('--repeat', type=int, default=1, help="Run parsing and both parts N times.")
+    parser.add_argument('--top', type=int, default=15, help="Number of entries shown by --profile and --mem.")
+    parser.add_argument('--engine', choices=['bisect', 'numpy'], default='bisect', help="Freshness lookup: bisect per ingredient, or np.searchsorted on all of them (default: bisect).")
+    parser.add_argument('--stream', nargs='?', const='', default=None, metavar='FILE', help="Stream the ingredients in batches over a saved interval index. Read them from FILE ('-' for stdin) or, without FILE, from the input file itself.")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help=f"Ingredients per batch with --stream (default: {BATCH_SIZE}).")
     return parser.parse_args()
 
+def run_phase(phase: str, func, arg, timings: dict, profilers: dict, memory: dict | None):
+    """Run a single phase, timing it and profiling it if requested."""
+    if memory is not None:
+        tracemalloc.start()
+    profiler = profilers.get(phase)
+    if profiler is not None:
+        profiler.enable()
+    
+    start_time = time.perf_counter_ns()
+    result = func(arg)
+    timings[phase].append(time.perf_counter_ns() - start_time)
+    
+    if profiler is not None:
+        profiler.disable()
+    if memory is not None: # Keep the last repetition
+        _, peak = tracemalloc.get_traced_memory()
+        memory[phase] = (peak, tracemalloc.take_snapshot())
+        tracemalloc.stop()
+    return result
+
+def report_profile(profilers: dict, dump_name: str, top: int):
+    for phase, profiler in profilers.items():
+        if dump_name:
+            profiler.dump_stats(f"{dump_name}_{phase}.prof")
+            print(f"Profile of '{phase}' saved to {dump_name}_{phase}.prof")
+        else:
+            print(f"--- Profile: {phase} ---")
+            pstats.Stats(profiler).sort_stats('cumulative').print_stats(top)
+
+def report_memory(memory: dict, top: int):
+    ignore = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"))
+    for phase, (peak, snapshot) in memory.items():
+        print(f"--- Memory: {phase} (peak {peak / 1024:.1f} KiB) ---")
+        for stat in snapshot.filter_traces(ignore).statistics('lineno')[:top]:
+            print(stat)
+
+def format_timing(samples_ns: list[int]) -> str:
+    if len(samples_ns) == 1:
+        return f"{samples_ns[0] / 1e9:.4f}s"
+    return f"{min(samples_ns) / 1e9:.4f}s (min of {len(samples_ns)}, mean {sum(samples_ns) / len(samples_ns) / 1e9:.4f}s)"
+
 def parse_input(file_name) -> tuple[list[tuple[int, int]], list[int]]:
+    if STREAM is not None:
+        return parse_input_stream(file_name, STREAM, BATCH_SIZE)
+    
     fresh_ingredient_ids: list[tuple[int, int]] = []
     ingredients: list[int] = []
     with open(file_name, 'r') as f:
@@ -63,20 +131,119 @@ def compact_list(tuple_list: list[tuple[int, int]]) -> list[tuple[int, int]]:
     compact_list.append(current_range)
     return compact_list.copy()
 
+def index_file_for(file_name: str) -> str:
+    return f"{os.path.splitext(file_name)[0]}-index.npz"
+
+def read_range_section(f) -> tuple[list[bytes], str]:
+    """Read the range lines up to the first blank line. Return them (not parsed) and the sha256 of the section."""
+    digest = hashlib.sha256()
+    lines: list[bytes] = []
+    for line in f:
+        line = line.strip() # Ignore line endings
+        if not line: break # End of the range section
+        digest.update(line + b'\n')
+        lines.append(line)
+    return lines, digest.hexdigest()
+
+def load_index(index_file: str, digest: str) -> tuple[np.ndarray, np.ndarray] | None:
+    """Starts and ends saved by save_index, if they were built from the same range section."""
+    if not os.path.exists(index_file):
+        return None
+    with np.load(index_file) as index:
+        if str(index['digest']) != digest:
+            return None
+        return index['starts'], index['ends']
+
+def save_index(index_file: str, digest: str, starts: np.ndarray, ends: np.ndarray):
+    with open(index_file, 'wb') as f: # np.savez would add '.npz' to a name without it
+        np.savez(f, starts=starts, ends=ends, digest=np.array(digest))
+
+def buffer_stdin() -> str:
+    """Copy stdin to a temporary file, so it can be streamed more than once. Return its name."""
+    with tempfile.NamedTemporaryFile('wb', prefix='aoc-2025-05-', suffix='.in', delete=False) as f:
+        shutil.copyfileobj(sys.stdin.buffer, f)
+    return f.name
+
+class IngredientStream:
+    """
+    Ingredients read `batch_size` at a time, as int64 arrays.
+    `starts` and `ends` are the interval index they are looked up in.
+    """
+    def __init__(self, file_name: str, offset: int, batch_size: int, starts: np.ndarray, ends: np.ndarray):
+        self.file_name = file_name # '-': stdin, can be read only once
+        self.offset = offset
+        self.batch_size = batch_size
+        self.starts, self.ends = starts, ends
+        self.stdin_read = False
+    
+    def batches(self, f):
+        while lines := [line for line in islice(f, self.batch_size) if line.strip()]:
+            yield np.array(lines).astype(np.int64)
+    
+    def __iter__(self):
+        if self.file_name == '-':
+            if self.stdin_read:
+                raise RuntimeError("The ingredients from stdin were already read: buffer them with buffer_stdin() to read them again.")
+            self.stdin_read = True
+            yield from self.batches(sys.stdin.buffer)
+            return
+        with open(self.file_name, 'rb') as f:
+            f.seek(self.offset)
+            yield from self.batches(f)
+
+def parse_input_stream(file_name, stream: str, batch_size: int) -> tuple[list[tuple[int, int]], IngredientStream]:
+    """Merged ranges from the saved index (rebuilt if the range section changed) and the ingredients to stream."""
+    global np # Stream mode: load_index, save_index and IngredientStream rely on it
+    import numpy as np
+    with open(file_name, 'rb') as f:
+        range_lines, digest = read_range_section(f)
+        offset = f.tell() # The ingredients start here
+    
+    index_file = index_file_for(file_name)
+    index = load_index(index_file, digest)
+    if index is None:
+        compacted = compact_list([tuple(map(int, line.split(b'-'))) for line in range_lines])
+        index = (np.array([range_[0] for range_ in compacted], dtype=np.int64),
+                 np.array([range_[1] for range_ in compacted], dtype=np.int64))
+        save_index(index_file, digest, *index)
+        log(f"Interval index built and saved to {index_file}")
+    else:
+        log(f"Interval index reused from {index_file}")
+    
+    starts, ends = index
+    ingredients = IngredientStream(stream or file_name, offset if not stream else 0, batch_size, starts, ends)
+    return list(zip(starts.tolist(), ends.tolist())), ingredients # The list is only for Part 2
+
 # --- SOLVE ---
+def range_starts_ends(fresh_ingredient_ids: list[tuple[int, int]]) -> tuple[list[int], list[int]]:
+    """Parallel arrays of starts and ends of the (sorted, non-overlapping) ranges from compact_list."""
+    return [range_[0] for range_ in fresh_ingredient_ids], [range_[1] for range_ in fresh_ingredient_ids]
+
+def is_fresh(ingredient: int, starts: list[int], ends: list[int]) -> bool:
+    """Binary search of the last range starting at or before the ingredient. Both ends are inclusive."""
+    i = bisect_right(starts, ingredient) - 1
+    return i >= 0 and ingredient <= ends[i]
+
+def count_fresh_numpy(ingredients, starts: list[int] | np.ndarray, ends: list[int] | np.ndarray) -> int:
+    """Same lookup as is_fresh for a whole batch of ingredients, with np.searchsorted. int64 arrays are used without copies."""
+    global np # Also called on its own by the numpy engine
+    import numpy as np
+    ingredients = np.asarray(ingredients, dtype=np.int64)
+    starts_arr, ends_arr = np.asarray(starts, dtype=np.int64), np.asarray(ends, dtype=np.int64)
+    i = np.searchsorted(starts_arr, ingredients, side='right') - 1
+    fresh = (i >= 0) & (ingredients <= ends_arr[np.maximum(i, 0)])
+    return int(np.count_nonzero(fresh))
+
 def solve_part1(data: tuple[list[tuple[int, int]], list[int]]) -> int:
     """Solution for Part 1."""
     fresh_ingredient_ids, ingredients = data # Unpack
-    def is_fresh(ingredient: int) -> bool:
-        nonlocal fresh_ingredient_ids
-        
-        for range_ in fresh_ingredient_ids:
-            if range_[1] < ingredient: continue # Skip
-            if range_[0] > ingredient: return False
-            if range_[0] < ingredient < range_[1]: return True
-        return False # Fallback
+    if isinstance(ingredients, IngredientStream): # Look up every batch in the saved index as it is
+        return sum(count_fresh_numpy(batch, ingredients.starts, ingredients.ends) for batch in ingredients)
     
-    return len(list(filter(is_fresh, ingredients)))
+    starts, ends = range_starts_ends(fresh_ingredient_ids)
+    if ENGINE == 'numpy':
+        return count_fresh_numpy(ingredients, starts, ends)
+    return sum(is_fresh(ingredient, starts, ends) for ingredient in ingredients)
 
 def solve_part2(data):
     """Solution for Part 2."""
@@ -93,22 +260,34 @@ if __name__ == '__main__':
     else:
         use_file = INPUT_FILE
     VERBOSE = args.verbose
+    ENGINE, STREAM, BATCH_SIZE = args.engine, args.stream, args.batch_size
+    if ENGINE == 'numpy' or STREAM is not None:
+        import numpy # Keep the import out of the parse and part1 timings
+    if STREAM == '-' and args.repeat > 1: # stdin can be read only once
+        STREAM = buffer_stdin()
+    
+    timings = {phase: [] for phase in PHASES}
+    profilers = {phase: cProfile.Profile() for phase in PHASES} if args.profile is not None else {}
+    memory = {} if args.mem else None
     
-    # Parsing
-    start_time = time.time()
-    data = parse_input(use_file)
-    log(f"Input parsed in {time.time()-start_time:.4f}s")
+    for _ in range(max(1, args.repeat)): # Parse again every time: solvers may modify their data
+        data = run_phase('parse', parse_input, use_file, timings, profilers, memory)
+        sol1 = run_phase('part1', solve_part1, data, timings, profilers, memory)
+        sol2 = run_phase('part2', solve_part2, data, timings, profilers, memory)
     
-    # Part 1
-    start_time = time.time()
-    sol1 = solve_part1(data)
-    log(f"Part 1: {sol1}, took {time.time()-start_time:.4f}s")
+    log(f"Input parsed in {format_timing(timings['parse'])}")
+    log(f"Part 1: {sol1}, took {format_timing(timings['part1'])}")
+    log(f"Part 2: {sol2}, took {format_timing(timings['part2'])}")
     
-    # Part 2
-    start_time = time.time()
-    sol2 = solve_part2(data)
-    log(f"Part 2: {sol2}, took {time.time()-start_time:.4f}s")
+    if profilers:
+        report_profile(profilers, args.profile, args.top)
+    if memory is not None:
+        report_memory(memory, args.top)
+
+    if STREAM != args.stream: # Buffered stdin
+        os.remove(STREAM)
 
     # --- PRINT SOLUTIONS ---
     print(f"AOC_SOL_1={sol1}")
     print(f"AOC_SOL_2={sol2}")
+    print(f"AOC_TIME={json.dumps({'parse': min(timings['parse']), 'p1': min(timings['part1']), 'p2': min(timings['part2'])})}") # Nanoseconds
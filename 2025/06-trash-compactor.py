@@ -2,21 +2,34 @@
 # Advent of Code 2025 - Day 06 - Trash Compactor
 # Problem: See .\2025\06-trash-compactor-description.md for full details
 # Author: Ciovino
-# Template Version: v1.0
+# Template Version: v2.2
 # ---------------------------------------------------------------------
+from __future__ import annotations
 import os
 import argparse
 import time
+import json
+import cProfile
+import pstats
+import tracemalloc
 
 # Useful imports
 import re
 from collections import defaultdict, Counter, deque
 from itertools import combinations, permutations, product
 from math import gcd, lcm, ceil, floor, prod
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    import numpy as np
 
 INPUT_FILE = os.path.join('data', '2025-06.in')
 TEST_FILE = os.path.join('data', 'test.in')
 VERBOSE = False
+PHASES = ('parse', 'part1', 'part2')
+ENGINE = 'python' # 'python' (strings) or 'numpy' (character matrix)
+MMAP_THRESHOLD = 64 * 1024 * 1024 # Bytes. Bigger worksheets are memory-mapped instead of read
+INT64_DIGITS = 18 # Any number with up to 18 digits fits in an int64
+BLANKS = b' \r\n' # Dropped from a number before decoding it as a Python int
 
 def log(*args, **kwargs):
     if VERBOSE: # Print only if VERBOSE is enabled
@@ -26,9 +39,58 @@ def get_args() -> dict:
     parser = argparse.ArgumentParser(description="Solution script for 06/2025 Advent of Code.")
     parser.add_argument('-t', '--test', action='store_true',  help=f"Run the script using the test file ({TEST_FILE})")
     parser.add_argument('-v', '--verbose', action='store_true', help="Enable verbose output.")
+    parser.add_argument('--profile', nargs='?', const='', default=None, metavar='FILE', help="Profile each phase with cProfile. Print the top functions, or dump them to FILE_<phase>.prof")
+    parser.add_argument('--mem', action='store_true', help="Report peak memory and top allocation sites of each phase (tracemalloc).")
+    parser.add_argument('--repeat', type=int, default=1, help="Run parsing and both parts N times.")
+    parser.add_argument('--top', type=int, default=15, help="Number of entries shown by --profile and --mem.")
+    parser.add_argument('--engine', choices=['python', 'numpy'], default='python', help="Solver engine (default: python).")
     return parser.parse_args()
 
+def run_phase(phase: str, func, arg, timings: dict, profilers: dict, memory: dict | None):
+    """Run a single phase, timing it and profiling it if requested."""
+    if memory is not None:
+        tracemalloc.start()
+    profiler = profilers.get(phase)
+    if profiler is not None:
+        profiler.enable()
+    
+    start_time = time.perf_counter_ns()
+    result = func(arg)
+    timings[phase].append(time.perf_counter_ns() - start_time)
+    
+    if profiler is not None:
+        profiler.disable()
+    if memory is not None: # Keep the last repetition
+        _, peak = tracemalloc.get_traced_memory()
+        memory[phase] = (peak, tracemalloc.take_snapshot())
+        tracemalloc.stop()
+    return result
+
+def report_profile(profilers: dict, dump_name: str, top: int):
+    for phase, profiler in profilers.items():
+        if dump_name:
+            profiler.dump_stats(f"{dump_name}_{phase}.prof")
+            print(f"Profile of '{phase}' saved to {dump_name}_{phase}.prof")
+        else:
+            print(f"--- Profile: {phase} ---")
+            pstats.Stats(profiler).sort_stats('cumulative').print_stats(top)
+
+def report_memory(memory: dict, top: int):
+    ignore = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"))
+    for phase, (peak, snapshot) in memory.items():
+        print(f"--- Memory: {phase} (peak {peak / 1024:.1f} KiB) ---")
+        for stat in snapshot.filter_traces(ignore).statistics('lineno')[:top]:
+            print(stat)
+
+def format_timing(samples_ns: list[int]) -> str:
+    if len(samples_ns) == 1:
+        return f"{samples_ns[0] / 1e9:.4f}s"
+    return f"{min(samples_ns) / 1e9:.4f}s (min of {len(samples_ns)}, mean {sum(samples_ns) / len(samples_ns) / 1e9:.4f}s)"
+
 def parse_input(file_name) -> tuple[list[list[str]], list[str]]:
+    if ENGINE == 'numpy':
+        return parse_input_numpy(file_name)
+    
     number_lines: list[str] = []
     with open(file_name, 'r') as f:
         for line in f:
@@ -53,6 +115,99 @@ def parse_numbers(number_lines: list[str]) -> list[list[str]]:
                 current_number[i] += digit[i]
     return result_list
 
+def load_char_matrix(file_name) -> np.ndarray:
+    """The file as a 2-D uint8 matrix, one row per line, padded with spaces. Blanks are the bytes <= ' ' (newlines too)."""
+    if os.path.getsize(file_name) > MMAP_THRESHOLD:
+        raw = np.memmap(file_name, dtype=np.uint8, mode='r')
+    else:
+        raw = np.fromfile(file_name, dtype=np.uint8)
+    
+    line_ends = np.flatnonzero(raw == ord('\n'))
+    if len(line_ends) > 0 and line_ends[-1] == len(raw) - 1 and np.all(np.diff(line_ends) == line_ends[0] + 1):
+        grid = raw.reshape(len(line_ends), -1) # Same length on every line: just a view
+    else:
+        line_starts = np.concatenate(([0], line_ends + 1))
+        line_ends = np.concatenate((line_ends, [len(raw)]))
+        grid = np.full((len(line_starts), int((line_ends - line_starts).max())), ord(' '), dtype=np.uint8)
+        for row, (start, end) in enumerate(zip(line_starts, line_ends)):
+            grid[row, :end - start] = raw[start:end]
+    
+    filled_rows = ~np.all(grid <= ord(' '), axis=1)
+    return grid if filled_rows.all() else grid[filled_rows] # Drop empty lines
+
+def parse_input_numpy(file_name) -> tuple[np.ndarray, list[str], np.ndarray, np.ndarray]:
+    """Digit rows, symbols, and first and last+1 column of every problem."""
+    global np # load_char_matrix, decode_numbers and reduce_problems use it too
+    import numpy as np
+    grid = load_char_matrix(file_name)
+    digits, symbols = grid[:-1], bytes(grid[-1]).decode().split()
+    
+    filled = ~np.all(digits <= ord(' '), axis=0)
+    edges = np.diff(np.concatenate(([False], filled, [False])).astype(np.int8))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    return digits, symbols, starts, ends
+
+def filled_columns(starts: np.ndarray, ends: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Indices of the columns of every problem, one after the other, and where each problem begins in them."""
+    sizes = ends - starts
+    offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    return np.arange(sizes.sum()) + np.repeat(starts - offsets, sizes), offsets
+
+def decode_numbers(digits: np.ndarray, starts: np.ndarray, ends: np.ndarray, axis: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Read the numbers along `axis` (1: row-wise inside every problem, 0: every column top to bottom).
+    Return the numbers (int64) grouped by problem, how many digits each one has, and where each problem begins.
+    """
+    columns, offsets = filled_columns(starts, ends)
+    is_digit = (digits >= ord('0')) & (digits <= ord('9'))
+    values = np.where(is_digit, digits.astype(np.int64) - ord('0'), 0)
+    
+    if axis == 0:
+        values, is_digit = values[:, columns], is_digit[:, columns]
+        below = is_digit.sum(axis=0) - np.cumsum(is_digit, axis=0) # Digits after this one in its number
+        powers = 10 ** np.minimum(below, INT64_DIGITS) # Clamped: longer numbers are decoded again as Python ints
+        return np.add.reduce(values * powers, axis=0), is_digit.sum(axis=0), offsets
+    
+    seen = np.cumsum(is_digit, axis=1)
+    below = seen[:, np.repeat(ends - 1, ends - starts)] - seen[:, columns]
+    values, is_digit = values[:, columns], is_digit[:, columns]
+    powers = 10 ** np.minimum(below, INT64_DIGITS)
+    numbers = np.add.reduceat(values * powers, offsets, axis=1) # (rows, problems)
+    counts = np.add.reduceat(is_digit, offsets, axis=1)
+    return numbers.T.ravel(), counts.T.ravel(), np.arange(len(starts)) * len(digits)
+
+def reduce_problems(numbers: np.ndarray, digit_counts: np.ndarray, offsets: np.ndarray, symbols: list[str], fallback) -> int:
+    """
+    Sum of all problems, with the operands of problem p in numbers[offsets[p]:offsets[p + 1]].
+    Problems that could overflow an int64 are solved again with Python ints from fallback(p).
+    """
+    symbols = np.array(symbols)
+    if not np.all((symbols == '+') | (symbols == '*')):
+        raise ValueError(f"Unknown problem type: {symbols[(symbols != '+') & (symbols != '*')][0]}")
+    is_product = symbols == '*'
+    
+    sizes = np.diff(np.concatenate((offsets, [len(numbers)])))
+    sum_digits = np.maximum.reduceat(digit_counts, offsets) + len(str(sizes.max())) # The sum of n numbers has at most len(str(n)) more digits
+    product_digits = np.add.reduceat(digit_counts, offsets)
+    safe = np.where(is_product, product_digits, sum_digits) <= INT64_DIGITS
+    
+    results = np.where(is_product, np.multiply.reduceat(numbers, offsets), np.add.reduceat(numbers, offsets))
+    total = sum(results[safe].tolist()) # Python ints: the grand total may not fit an int64
+    for p in np.flatnonzero(~safe):
+        log(f"Problem {p} may overflow an int64, solved with Python ints")
+        total += solve_problem(fallback(p), str(symbols[p]))
+    return total
+
+def solve_part1_numpy(data: tuple[np.ndarray, list[str], np.ndarray, np.ndarray]) -> int:
+    digits, symbols, starts, ends = data
+    fallback = lambda p: [bytes(row).translate(None, BLANKS) for row in digits[:, starts[p]:ends[p]]]
+    return reduce_problems(*decode_numbers(digits, starts, ends, axis=1), symbols, fallback)
+
+def solve_part2_numpy(data: tuple[np.ndarray, list[str], np.ndarray, np.ndarray]) -> int:
+    digits, symbols, starts, ends = data
+    fallback = lambda p: [bytes(column).translate(None, BLANKS) for column in digits[:, starts[p]:ends[p]].T]
+    return reduce_problems(*decode_numbers(digits, starts, ends, axis=0), symbols, fallback)
+
 # --- SOLVE ---
 def solve_problem(input: tuple[str], problem_type: str):
     # Input are strings, convert them in int
@@ -72,12 +227,18 @@ def solve_cephalopod_problem(input: tuple[str], problem_type: str):
 
 def solve_part1(data: tuple[list[list[str]], list[str]]):
     """Solution for Part 1."""
+    if ENGINE == 'numpy':
+        return solve_part1_numpy(data)
+    
     numbers, symbols = data
     problem_input = list(zip(*numbers))
     return sum([solve_problem(input, problem) for input, problem in zip(problem_input, symbols)])
 
 def solve_part2(data: tuple[list[list[str]], list[str]]):
     """Solution for Part 2."""
+    if ENGINE == 'numpy':
+        return solve_part2_numpy(data)
+    
     numbers, symbols = data
     problem_input = list(zip(*numbers))
     return sum(solve_cephalopod_problem(input, problem) for input, problem in zip(problem_input, symbols))
@@ -92,22 +253,29 @@ if __name__ == '__main__':
     else:
         use_file = INPUT_FILE
     VERBOSE = args.verbose
+    ENGINE = args.engine
+    if ENGINE == 'numpy':
+        import numpy # The first parse would otherwise be timed with the numpy import
+    
+    timings = {phase: [] for phase in PHASES}
+    profilers = {phase: cProfile.Profile() for phase in PHASES} if args.profile is not None else {}
+    memory = {} if args.mem else None
     
-    # Parsing
-    start_time = time.time()
-    data = parse_input(use_file)
-    log(f"Input parsed in {time.time()-start_time:.4f}s")
+    for _ in range(max(1, args.repeat)): # Parse again every time: solvers may modify their data
+        data = run_phase('parse', parse_input, use_file, timings, profilers, memory)
+        sol1 = run_phase('part1', solve_part1, data, timings, profilers, memory)
+        sol2 = run_phase('part2', solve_part2, data, timings, profilers, memory)
     
-    # Part 1
-    start_time = time.time()
-    sol1 = solve_part1(data)
-    log(f"Part 1: {sol1}, took {time.time()-start_time:.4f}s")
+    log(f"Input parsed in {format_timing(timings['parse'])}")
+    log(f"Part 1: {sol1}, took {format_timing(timings['part1'])}")
+    log(f"Part 2: {sol2}, took {format_timing(timings['part2'])}")
     
-    # Part 2
-    start_time = time.time()
-    sol2 = solve_part2(data)
-    log(f"Part 2: {sol2}, took {time.time()-start_time:.4f}s")
+    if profilers:
+        report_profile(profilers, args.profile, args.top)
+    if memory is not None:
+        report_memory(memory, args.top)
 
     # --- PRINT SOLUTIONS ---
     print(f"AOC_SOL_1={sol1}")
     print(f"AOC_SOL_2={sol2}")
+    print(f"AOC_TIME={json.dumps({'parse': min(timings['parse']), 'p1': min(timings['part1']), 'p2': min(timings['part2'])})}") # Nanoseconds
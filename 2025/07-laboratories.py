@@ -2,21 +2,28 @@
 # Advent of Code 2025 - Day 07 - Laboratories
 # Problem: See .\2025/07-laboratories-description.md for full details
 # Author: Ciovino
-# Template Version: v1.0
+# Template Version: v2.2
 # ---------------------------------------------------------------------
 import os
 import argparse
 import time
+import json
+import cProfile
+import pstats
+import tracemalloc
 
 # Useful imports
 import re
 from collections import defaultdict, Counter, deque
-from itertools import combinations, permutations, product
+from itertools import combinations, permutations, product, compress
 from math import gcd, lcm, ceil, floor
 
 INPUT_FILE = os.path.join('data', '2025-07.in')
 TEST_FILE = os.path.join('data', 'test.in')
 VERBOSE = False
+PHASES = ('parse', 'part1', 'part2')
+ENGINE = 'counts' # Part 1 engine: 'counts' (timelines per column) or 'bitset' (beams as bits of an int)
+SPLITTER_BITS = str.maketrans({'.': '0', '^': '1', 'S': '0'})
 
 def log(*args, **kwargs):
     if VERBOSE: # Print only if VERBOSE is enabled
@@ -26,67 +33,122 @@ def get_args() -> dict:
     parser = argparse.ArgumentParser(description="Solution script for 07/2025 Advent of Code.")
     parser.add_argument('-t', '--test', action='store_true',  help=f"Run the script using the test file ({TEST_FILE})")
     parser.add_argument('-v', '--verbose', action='store_true', help="Enable verbose output.")
+    parser.add_argument('--profile', nargs='?', const='', default=None, metavar='FILE', help="Profile each phase with cProfile. Print the top functions, or dump them to FILE_<phase>.prof")
+    parser.add_argument('--mem', action='store_true', help="Report peak memory and top allocation sites of each phase (tracemalloc).")
+    parser.add_argument('--repeat', type=int, default=1, help="Run parsing and both parts N times.")
+    parser.add_argument('--top', type=int, default=15, help="Number of entries shown by --profile and --mem.")
+    parser.add_argument('--engine', choices=['counts', 'bitset'], default='counts', help="Part 1 engine (default: counts). Part 2 always counts timelines.")
     return parser.parse_args()
 
+def run_phase(phase: str, func, arg, timings: dict, profilers: dict, memory: dict | None):
+    """Run a single phase, timing it and profiling it if requested."""
+    if memory is not None:
+        tracemalloc.start()
+    profiler = profilers.get(phase)
+    if profiler is not None:
+        profiler.enable()
+    
+    start_time = time.perf_counter_ns()
+    result = func(arg)
+    timings[phase].append(time.perf_counter_ns() - start_time)
+    
+    if profiler is not None:
+        profiler.disable()
+    if memory is not None: # Keep the last repetition
+        _, peak = tracemalloc.get_traced_memory()
+        memory[phase] = (peak, tracemalloc.take_snapshot())
+        tracemalloc.stop()
+    return result
+
+def report_profile(profilers: dict, dump_name: str, top: int):
+    for phase, profiler in profilers.items():
+        if dump_name:
+            profiler.dump_stats(f"{dump_name}_{phase}.prof")
+            print(f"Profile of '{phase}' saved to {dump_name}_{phase}.prof")
+        else:
+            print(f"--- Profile: {phase} ---")
+            pstats.Stats(profiler).sort_stats('cumulative').print_stats(top)
+
+def report_memory(memory: dict, top: int):
+    ignore = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"))
+    for phase, (peak, snapshot) in memory.items():
+        print(f"--- Memory: {phase} (peak {peak / 1024:.1f} KiB) ---")
+        for stat in snapshot.filter_traces(ignore).statistics('lineno')[:top]:
+            print(stat)
+
+def format_timing(samples_ns: list[int]) -> str:
+    if len(samples_ns) == 1:
+        return f"{samples_ns[0] / 1e9:.4f}s"
+    return f"{min(samples_ns) / 1e9:.4f}s (min of {len(samples_ns)}, mean {sum(samples_ns) / len(samples_ns) / 1e9:.4f}s)"
+
 def parse_input(file_name) -> list[list[str]]:
     with open(file_name, 'r') as f:
         data: list[list[str]] = list(map(lambda s: s.strip(), f.readlines()))
     return data
 
 # --- SOLVE ---
-def count_beam_split(beam_source: int, tachyon: list[list[str]]) -> tuple[int, dict[int, set[int]]]:
+def propagate_beams(beam_source: int, tachyon: list[list[str]]) -> tuple[int, int]:
+    """
+    Move the beams down one row at a time, keeping how many timelines reach every column.
+    Return the number of splits and the number of timelines at the bottom.
+    """
+    width = len(tachyon[0])
+    timelines: list[int] = [0] * width
+    timelines[beam_source] = 1
     total_splits = 0
-    beam_positions: dict[int, set[int]] = { 0: {beam_source} }
     for i, line in enumerate(tachyon[1:], start=1): # Skip first line
-        # Check if the beam will be splitted
-        new_beam_positions: set[int] = set()
-        for pos in beam_positions[i - 1]:
-            if line[pos] == '^': # Split the beam -> Add one to the right and to the left
-                new_beam_positions.add(pos - 1)
-                new_beam_positions.add(pos + 1)
+        new_timelines: list[int] = [0] * width
+        for pos in compress(range(width), timelines): # Only columns with a beam
+            count = timelines[pos]
+            if line[pos] == '^': # Split the beam -> Every timeline goes both left and right
+                if pos > 0: new_timelines[pos - 1] += count
+                if pos < width - 1: new_timelines[pos + 1] += count # Beams leaving the manifold are lost
                 # Add a split
                 total_splits += 1
             elif line[pos] == '.': # Pass the beam down
-                new_beam_positions.add(pos)
+                new_timelines[pos] += count
             else:
                 raise ValueError(f"Unknown character at position ({i}, {pos}): {line[pos]}")
-        # Add beam for next iterations
-        beam_positions[i] = new_beam_positions
-    return total_splits, beam_positions
+        timelines = new_timelines
+    return total_splits, sum(timelines)
+
+def splitter_mask(line: str) -> int:
+    """Bit i set if there is a splitter in column i."""
+    return int(line.translate(SPLITTER_BITS)[::-1], 2)
+
+def count_splits_bitset(beam_source: int, tachyon: list[list[str]]) -> int:
+    """Only which columns are lit matters: move the whole beam front at once."""
+    inside = (1 << len(tachyon[0])) - 1 # Beams leaving the manifold are lost
+    beams = 1 << beam_source
+    total_splits = 0
+    for line in tachyon[1:]: # Skip first line
+        splitters = splitter_mask(line)
+        hit = beams & splitters
+        beams = ((beams & ~splitters) | (hit << 1) | (hit >> 1)) & inside
+        total_splits += hit.bit_count()
+    return total_splits
+
+last_pass: tuple[list[list[str]], tuple[int, int]] | None = None # (Manifold, result of propagate_beams on it)
+
+def beam_pass(tachyon_manifold: list[list[str]]) -> tuple[int, int]:
+    """propagate_beams, run once per parsed manifold: both parts read the same result."""
+    global last_pass
+    if last_pass is None or last_pass[0] is not tachyon_manifold: # Same object, not only same content: --repeat parses again
+        last_pass = (tachyon_manifold, propagate_beams(tachyon_manifold[0].find('S'), tachyon_manifold))
+    return last_pass[1]
 
 def solve_part1(tachyon_manifold: list[list[str]]) -> int:
     """Solution for Part 1."""
-    split, _ = count_beam_split(tachyon_manifold[0].find('S'), tachyon_manifold)
-    return split
-
-def count_timeline_dp(all_beam_positions: dict[int, set[int]], tachyon: list[list[str]]) -> int:
-    N: int = len(tachyon) # Number of rows
-    dynamic_programming: dict[tuple[int, int], int] = {}
-    
-    # Initialize Dynamic Programming value from the bottom row
-    last_row = N - 1
-    for pos in all_beam_positions[last_row]:
-        dynamic_programming[(last_row, pos)] = 1
+    if ENGINE == 'bitset':
+        return count_splits_bitset(tachyon_manifold[0].find('S'), tachyon_manifold)
     
-    # Start from the N-2
-    for row in range(N-2, 0, -1): # Avoid first row (the one with the 'S')
-        for pos in all_beam_positions[row]:
-            if tachyon[row + 1][pos] == '^': # Beam splitted
-                dynamic_programming[(row, pos)] = dynamic_programming[(row+1, pos-1)] + dynamic_programming[(row+1, pos+1)]
-            elif tachyon[row + 1][pos] == '.': # Straight beam
-                dynamic_programming[(row, pos)] = dynamic_programming[(row+1, pos)]
-            else:
-                raise ValueError(f"Unknown character at position ({row}, {pos}): {tachyon[row][pos]}")
-    
-    starting_row = 1 # Get the total beam path from column 1
-    starting_col = next(iter(all_beam_positions[starting_row]))
-    return dynamic_programming[(starting_row, starting_col)]
+    split, _ = beam_pass(tachyon_manifold)
+    return split
 
 def solve_part2(tachyon_manifold: list[list[str]]) -> int:
     """Solution for Part 2."""
-    _, beam_positions = count_beam_split(tachyon_manifold[0].find('S'), tachyon_manifold)
-    timelines_dp = count_timeline_dp(beam_positions, tachyon_manifold)
-    return timelines_dp
+    _, timelines = beam_pass(tachyon_manifold)
+    return timelines
 
 if __name__ == '__main__':
     args = get_args()
@@ -98,22 +160,27 @@ if __name__ == '__main__':
     else:
         use_file = INPUT_FILE
     VERBOSE = args.verbose
+    ENGINE = args.engine
+    
+    timings = {phase: [] for phase in PHASES}
+    profilers = {phase: cProfile.Profile() for phase in PHASES} if args.profile is not None else {}
+    memory = {} if args.mem else None
     
-    # Parsing
-    start_time = time.time()
-    data = parse_input(use_file)
-    log(f"Input parsed in {time.time()-start_time:.4f}s")
+    for _ in range(max(1, args.repeat)): # Parse again every time: solvers may modify their data
+        data = run_phase('parse', parse_input, use_file, timings, profilers, memory)
+        sol1 = run_phase('part1', solve_part1, data, timings, profilers, memory)
+        sol2 = run_phase('part2', solve_part2, data, timings, profilers, memory)
     
-    # Part 1
-    start_time = time.time()
-    sol1 = solve_part1(data)
-    log(f"Part 1: {sol1}, took {time.time()-start_time:.4f}s")
+    log(f"Input parsed in {format_timing(timings['parse'])}")
+    log(f"Part 1: {sol1}, took {format_timing(timings['part1'])}")
+    log(f"Part 2: {sol2}, took {format_timing(timings['part2'])}")
     
-    # Part 2
-    start_time = time.time()
-    sol2 = solve_part2(data)
-    log(f"Part 2: {sol2}, took {time.time()-start_time:.4f}s")
+    if profilers:
+        report_profile(profilers, args.profile, args.top)
+    if memory is not None:
+        report_memory(memory, args.top)
 
     # --- PRINT SOLUTIONS ---
     print(f"AOC_SOL_1={sol1}")
     print(f"AOC_SOL_2={sol2}")
+    print(f"AOC_TIME={json.dumps({'parse': min(timings['parse']), 'p1': min(timings['part1']), 'p2': min(timings['part2'])})}") # Nanoseconds
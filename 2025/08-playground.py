@@ -2,22 +2,34 @@
 # Advent of Code 2025 - Day 08 - Playground
 # Problem: See .\2025/08-playground-description.md for full details
 # Author: Ciovino
-# Template Version: v1.0
+# Template Version: v2.2
 # ---------------------------------------------------------------------
+from __future__ import annotations
 import os
 import argparse
 import time
+import json
+import cProfile
+import pstats
+import tracemalloc
 
 # Useful imports
 import re
 from collections import defaultdict, Counter, deque
 from itertools import combinations, permutations, product
 from math import gcd, lcm, ceil, floor, sqrt, prod
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    import numpy as np
 
 INPUT_FILE = os.path.join('data', '2025-08.in')
 TEST_FILE = os.path.join('data', 'test.in')
 VERBOSE = False
+PHASES = ('parse', 'part1', 'part2')
 PAIR = 1000
+ENGINE = 'python' # 'python' (all distances sorted up front) or 'numpy' (blocked squared distances, selected a tier at a time)
+BLOCK_PAIRS = 1 << 22 # Distances computed at once by the numpy engine
+NO_PAIR = (1 << 63) - 1 # Distance of the pairs to skip inside a block (max int64)
 
 def log(*args, **kwargs):
     if VERBOSE: # Print only if VERBOSE is enabled
@@ -27,9 +39,58 @@ def get_args() -> dict:
     parser = argparse.ArgumentParser(description="Solution script for 08/2025 Advent of Code.")
     parser.add_argument('-t', '--test', action='store_true',  help=f"Run the script using the test file ({TEST_FILE})")
     parser.add_argument('-v', '--verbose', action='store_true', help="Enable verbose output.")
+    parser.add_argument('--profile', nargs='?', const='', default=None, metavar='FILE', help="Profile each phase with cProfile. Print the top functions, or dump them to FILE_<phase>.prof")
+    parser.add_argument('--mem', action='store_true', help="Report peak memory and top allocation sites of each phase (tracemalloc).")
+    parser.add_argument('--repeat', type=int, default=1, help="Run parsing and both parts N times.")
+    parser.add_argument('--top', type=int, default=15, help="Number of entries shown by --profile and --mem.")
+    parser.add_argument('--engine', choices=['python', 'numpy'], default='python', help="Solver engine (default: python).")
     return parser.parse_args()
 
+def run_phase(phase: str, func, arg, timings: dict, profilers: dict, memory: dict | None):
+    """Run a single phase, timing it and profiling it if requested."""
+    if memory is not None:
+        tracemalloc.start()
+    profiler = profilers.get(phase)
+    if profiler is not None:
+        profiler.enable()
+    
+    start_time = time.perf_counter_ns()
+    result = func(arg)
+    timings[phase].append(time.perf_counter_ns() - start_time)
+    
+    if profiler is not None:
+        profiler.disable()
+    if memory is not None: # Keep the last repetition
+        _, peak = tracemalloc.get_traced_memory()
+        memory[phase] = (peak, tracemalloc.take_snapshot())
+        tracemalloc.stop()
+    return result
+
+def report_profile(profilers: dict, dump_name: str, top: int):
+    for phase, profiler in profilers.items():
+        if dump_name:
+            profiler.dump_stats(f"{dump_name}_{phase}.prof")
+            print(f"Profile of '{phase}' saved to {dump_name}_{phase}.prof")
+        else:
+            print(f"--- Profile: {phase} ---")
+            pstats.Stats(profiler).sort_stats('cumulative').print_stats(top)
+
+def report_memory(memory: dict, top: int):
+    ignore = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"))
+    for phase, (peak, snapshot) in memory.items():
+        print(f"--- Memory: {phase} (peak {peak / 1024:.1f} KiB) ---")
+        for stat in snapshot.filter_traces(ignore).statistics('lineno')[:top]:
+            print(stat)
+
+def format_timing(samples_ns: list[int]) -> str:
+    if len(samples_ns) == 1:
+        return f"{samples_ns[0] / 1e9:.4f}s"
+    return f"{min(samples_ns) / 1e9:.4f}s (min of {len(samples_ns)}, mean {sum(samples_ns) / len(samples_ns) / 1e9:.4f}s)"
+
 def parse_input(file_name) -> tuple[dict[int, tuple[int, int, int]], list[int], list[tuple[tuple, tuple, float]]]:
+    if ENGINE == 'numpy':
+        return parse_input_numpy(file_name)
+    
     data: dict[int, tuple[int, int, int]] = {}
     with open(file_name, 'r') as f:
         for i, line in enumerate(f):
@@ -51,6 +112,69 @@ def compute_all_distances(all_points: dict[int, tuple]) -> list[tuple[int, int,
     all_pairs.sort(key=lambda x: x[2]) # Sort by distance
     return all_pairs
 
+def parse_input_numpy(file_name) -> tuple[np.ndarray, list[int], PairsByDistance]:
+    global np # Needed later by smallest_pairs and keep_smallest, called through PairsByDistance
+    import numpy as np
+    points = np.loadtxt(file_name, delimiter=',', dtype=np.int64, ndmin=2)
+    return points, list(range(len(points))), PairsByDistance(points, PAIR)
+
+def keep_smallest(distances: np.ndarray, pairs: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """The k smallest distances (and ties with the k-th one), in no particular order."""
+    if len(distances) > k:
+        kth = distances[np.argpartition(distances, k - 1)[k - 1]]
+        keep = np.flatnonzero(distances <= kth)
+        distances, pairs = distances[keep], pairs[keep]
+    valid = distances != NO_PAIR
+    return distances[valid], pairs[valid]
+
+def smallest_pairs(points: np.ndarray, k: int, above: int = -1) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    The k closest pairs i < j with squared distance greater than `above`, sorted by distance and then by (i, j).
+    Distances are computed BLOCK_PAIRS at a time, so memory does not grow with N^2.
+    """
+    N = len(points)
+    distances, pairs = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64) # Pair (i, j) stored as i * N + j
+    block_rows = max(1, BLOCK_PAIRS // max(N, 1))
+    for start in range(0, N - 1, block_rows):
+        stop = min(start + block_rows, N - 1)
+        block = np.zeros((stop - start, N - start - 1), dtype=np.int64) # Rows i in [start, stop), columns j in [start + 1, N)
+        for axis in range(points.shape[1]):
+            block += (points[start:stop, axis, None] - points[None, start + 1:, axis]) ** 2
+        block[np.tril_indices(stop - start, -1, N - start - 1)] = NO_PAIR # j <= i
+        if above >= 0:
+            block[block <= above] = NO_PAIR # Already in a previous tier
+        
+        block_distances, block_flat = keep_smallest(block.ravel(), np.arange(block.size), k)
+        rows, cols = np.divmod(block_flat, block.shape[1])
+        block_pairs = (rows + start) * N + cols + start + 1
+        distances, pairs = keep_smallest(np.concatenate((distances, block_distances)), np.concatenate((pairs, block_pairs)), k)
+    
+    order = np.lexsort((pairs, distances)) # Same order of the stable sort of the python engine
+    return pairs[order] // N, pairs[order] % N, distances[order]
+
+class PairsByDistance:
+    """
+    All pairs (i, j, squared distance) from the closest one, selected a tier at a time.
+    Every tier is twice as big as the previous one. Tiers already computed are reused.
+    """
+    def __init__(self, points: np.ndarray, first_tier: int):
+        self.points = points
+        self.first_tier = first_tier
+        self.tiers: list[list[tuple[int, int, int]]] = []
+    
+    def __iter__(self):
+        for tier in self.tiers:
+            yield from tier
+        above = self.tiers[-1][-1][2] if self.tiers else -1
+        k = self.first_tier << len(self.tiers)
+        while True:
+            i, j, distances = smallest_pairs(self.points, k, above)
+            if len(distances) == 0: return # All pairs done
+            self.tiers.append(list(zip(i.tolist(), j.tolist(), distances.tolist())))
+            log(f"Tier {len(self.tiers)}: {len(distances)} pairs up to squared distance {distances[-1]}")
+            yield from self.tiers[-1]
+            above, k = self.tiers[-1][-1][2], 2 * k
+
 def find(jbox_A: int, parents: list[int]) -> int:
     if parents[jbox_A] == jbox_A:
         return jbox_A
@@ -86,12 +210,15 @@ def solve_part2(data: tuple[dict[int, tuple[int, int, int]], list[int], list[tup
     """Solution for Part 2."""
     jboxes, circuits, all_pairs = data # Unpack
     last_connected: tuple[int, int] = (-1, -1)
+    groups = sum(find(j, circuits) == j for j in range(len(circuits)))
     
     for jbox_A, jbox_B, _ in all_pairs:
+        if groups == 1: break # Nothing left to connect
         if connect_jboxes(circuits, jbox_A, jbox_B):
             last_connected = (jbox_A, jbox_B)
+            groups -= 1
     
-    return jboxes[last_connected[0]][0] * jboxes[last_connected[1]][0]
+    return int(jboxes[last_connected[0]][0]) * int(jboxes[last_connected[1]][0])
 
 if __name__ == '__main__':
     args = get_args()
@@ -103,22 +230,29 @@ if __name__ == '__main__':
     else:
         use_file = INPUT_FILE
     VERBOSE = args.verbose
+    ENGINE = args.engine
+    if ENGINE == 'numpy':
+        import numpy # Imported before parse_input_numpy runs, so its timing leaves the import out
+    
+    timings = {phase: [] for phase in PHASES}
+    profilers = {phase: cProfile.Profile() for phase in PHASES} if args.profile is not None else {}
+    memory = {} if args.mem else None
     
-    # Parsing
-    start_time = time.time()
-    data = parse_input(use_file)
-    log(f"Input parsed in {time.time()-start_time:.4f}s")
+    for _ in range(max(1, args.repeat)): # Parse again every time: solvers may modify their data
+        data = run_phase('parse', parse_input, use_file, timings, profilers, memory)
+        sol1 = run_phase('part1', solve_part1, data, timings, profilers, memory)
+        sol2 = run_phase('part2', solve_part2, data, timings, profilers, memory)
     
-    # Part 1
-    start_time = time.time()
-    sol1 = solve_part1(data)
-    log(f"Part 1: {sol1}, took {time.time()-start_time:.4f}s")
+    log(f"Input parsed in {format_timing(timings['parse'])}")
+    log(f"Part 1: {sol1}, took {format_timing(timings['part1'])}")
+    log(f"Part 2: {sol2}, took {format_timing(timings['part2'])}")
     
-    # Part 2
-    start_time = time.time()
-    sol2 = solve_part2(data)
-    log(f"Part 2: {sol2}, took {time.time()-start_time:.4f}s")
+    if profilers:
+        report_profile(profilers, args.profile, args.top)
+    if memory is not None:
+        report_memory(memory, args.top)
 
     # --- PRINT SOLUTIONS ---
     print(f"AOC_SOL_1={sol1}")
     print(f"AOC_SOL_2={sol2}")
+    print(f"AOC_TIME={json.dumps({'parse': min(timings['parse']), 'p1': min(timings['part1']), 'p2': min(timings['part2'])})}") # Nanoseconds
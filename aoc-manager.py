@@ -1,21 +1,35 @@
 # ---------------------------------------------------------------------
-# Advent of Code Manager v.1.1.3
+# Advent of Code Manager v.1.10.0
 # Author: Ciovino
 # Description: Automates the AoC workflow: fetches inputs, parses HTML 
 #              descriptions to Markdown, generates solution templates, 
 #              executes logic, and submits answers via HTTP requests.
 # ---------------------------------------------------------------------
-import requests
-import configparser
 import os
 import re
 import sys
-from bs4 import BeautifulSoup, NavigableString, Tag
+import json
+import hashlib
+import importlib.util
+import math
+import statistics
 import logging
 import argparse
 import subprocess
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from functools import lru_cache
 from string import Template
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+# requests, bs4 and configparser are imported on first use: paths that never touch
+# the network (e.g. everything is already on disk) don't pay for them
+if TYPE_CHECKING:
+    import requests
+    from bs4 import Tag
 
 logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s',
@@ -23,23 +37,113 @@ logging.basicConfig(
     encoding='utf-8',
 )
 
-config = configparser.ConfigParser()
-config.read('config.ini')
+CONFIG_FILE = 'config.ini'
+
+@lru_cache(maxsize=None)
+def get_config():
+    """ Read config.ini the first time a setting is needed """
+    import configparser
+    config = configparser.ConfigParser()
+    config.read(CONFIG_FILE)
+    return config
+
+def data_folder() -> Path:
+    return Path(get_config()['PATHS']['data_folder'])
+
+def page_cache_folder() -> Path:
+    return data_folder() / 'cache'
+
+def timings_file() -> Path:
+    """ Timings of the last run of every script, used to schedule run-all """
+    return data_folder() / 'timings.json'
+
+def timing_history_file() -> Path:
+    """ One JSON line per run of a script, with its timings """
+    return data_folder() / 'timings-history.jsonl'
 
-SESSION = config['AOC']['session']
-USER_AGENT = config['AOC']['user_agent']
-DATA_FOLDER = Path(config['PATHS']['data_folder'])
-TEMPLATE_FILE = Path(config['TEMPLATE'].get('template_file', 'base-template.py'))
+def template_file() -> Path:
+    return Path(get_config()['TEMPLATE'].get('template_file', 'base-template.py'))
 
-HEADERS = {
-    "User-Agent": USER_AGENT,
-    "Cookie": f"session={SESSION}"
-}
+# HTTP settings (optional [HTTP] section in config.ini)
+def http_timeout() -> tuple[float, float]:
+    """ (connect, read) timeouts """
+    config = get_config()
+    return (config.getfloat('HTTP', 'connect_timeout', fallback=5.0),
+            config.getfloat('HTTP', 'read_timeout', fallback=30.0))
+
+def requests_per_second() -> float:
+    return get_config().getfloat('HTTP', 'requests_per_second', fallback=1.0)
+
+def build_session() -> "requests.Session":
+    """
+    Create a pooled, keep-alive session shared by every request to the AoC server
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    
+    config = get_config()
+    retry = Retry(
+        total=config.getint('HTTP', 'max_retries', fallback=3),
+        backoff_factor=config.getfloat('HTTP', 'backoff_factor', fallback=0.5), # Sleep 0.5s, 1s, 2s, ... between attempts
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=frozenset({"GET"}), # Never re-send an answer: POST is retried only if the connection failed
+        raise_on_status=False, # Return the last response, the status code is checked by the caller
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=1, pool_maxsize=10)
+    
+    session = requests.Session()
+    session.headers.update({
+        "User-Agent": config['AOC']['user_agent'],
+        "Cookie": f"session={config['AOC']['session']}"
+    })
+    session.mount("https://", adapter)
+    return session
+
+_http_session = None
+_http_session_lock = threading.Lock()
+
+def get_http_session() -> "requests.Session":
+    """ Shared session, built on the first request """
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            _http_session = build_session()
+    return _http_session
+
+class RateLimiter:
+    """
+    Global limiter shared by every thread: at most `rate` requests per second.
+    If no rate is given, it's read from config.ini before the first request
+    """
+    def __init__(self, rate: float | None = None):
+        self.lock = threading.Lock()
+        self.next_slot = 0.0
+        self.interval = None
+        if rate is not None:
+            self.set_rate(rate)
+    
+    def set_rate(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0 # rate <= 0 disables the limit
+    
+    def wait(self):
+        with self.lock: # Reserve the next free slot
+            if self.interval is None:
+                self.set_rate(requests_per_second())
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+RATE_LIMITER = RateLimiter()
 
 def process_inline_elements(tag):
     """
     Manage inline formatting (bold, code, links, easter eggs)
     """
+    from bs4 import NavigableString, Tag
     text_parts = []
     
     for child in tag.children:
@@ -66,10 +170,11 @@ def process_inline_elements(tag):
                 
     return "".join(text_parts)
 
-def to_markdown(article_content: list[Tag]):
+def to_markdown(article_content: list["Tag"]):
     """
     Prepare <article> HTML for a Markdown file, following a custom format
     """
+    from bs4 import NavigableString
     blocks = []
     
     for child in article_content:
@@ -130,16 +235,12 @@ def sanitaze_title(title: str) -> str:
         title_sanitized = title_sanitized.replace(c, '')
     return title_sanitized
 
-def get_page_data(year, day):
-    base_url = f"https://adventofcode.com/{year}/day/{day}"
-    logging.info(f"Fetching: {base_url}")
-    
-    resp_page = requests.get(base_url, headers=HEADERS)
-    if resp_page.status_code != 200:
-        logging.error(f"Error {resp_page.status_code}. Exiting...")
-        sys.exit(1)
-        
-    soup = BeautifulSoup(resp_page.text, 'html.parser')
+def parse_page(html: str, day: int) -> dict:
+    """
+    Extract title, Markdown description and status from the puzzle HTML
+    """
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
     
     # 1. Problem Title
     main_h2 = soup.find('h2').text
@@ -171,35 +272,145 @@ def get_page_data(year, day):
         status = "PART2"
     else:
         status = "PART1"
+    
+    return {
+        "title_sanitized": title_sanitized,
+        "title_clean": title_clean,
+        "status": status,
+        "description": full_markdown,
+    }
+
+def page_cache_paths(year, day) -> tuple[Path, Path]:
+    """ Paths of the cached raw HTML and of its metadata (validators + parsed page) """
+    name = f"{year}-{day:02d}"
+    return page_cache_folder() / f"{name}.html", page_cache_folder() / f"{name}.json"
+
+def load_page_cache(year, day) -> dict | None:
+    html_path, meta_path = page_cache_paths(year, day)
+    if not (html_path.exists() and meta_path.exists()):
+        return None
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        logging.warning(f"Corrupted page cache for {year}/{day:02d}, ignoring it.")
+        return None
+
+def save_page_cache(year, day, html: str, headers, page: dict):
+    html_path, meta_path = page_cache_paths(year, day)
+    os.makedirs(page_cache_folder(), exist_ok=True)
+    
+    with open(html_path, 'w', encoding='utf-8') as f:
+        f.write(html)
+    meta = {
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+        "sha256": hashlib.sha256(html.encode('utf-8')).hexdigest(),
+        "page": page,
+    }
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+
+def invalidate_page_cache(year, day):
+    """ Drop the cached page. Called after a correct answer, since that's when the page changes """
+    for path in page_cache_paths(year, day):
+        if path.exists():
+            path.unlink()
+    logging.info(f"Page cache invalidated for {year}/{day:02d}")
+
+def get_page_data(year, day):
+    import requests
+    base_url = f"https://adventofcode.com/{year}/day/{day}"
+    logging.info(f"Fetching: {base_url}")
+    
+    # Conditional request, if the page has been already downloaded
+    cache = load_page_cache(year, day)
+    conditional_headers = {}
+    if cache is not None:
+        if cache.get("etag"):
+            conditional_headers["If-None-Match"] = cache["etag"]
+        if cache.get("last_modified"):
+            conditional_headers["If-Modified-Since"] = cache["last_modified"]
+    
+    try:
+        RATE_LIMITER.wait()
+        resp_page = get_http_session().get(base_url, headers=conditional_headers, timeout=http_timeout())
+    except requests.RequestException as e:
+        logging.error(f"Network error: {e}. Exiting...")
+        sys.exit(1)
+    
+    if resp_page.status_code == 304 and cache is not None:
+        logging.info("Page not modified, using cached description.")
+        page = cache["page"]
+    elif resp_page.status_code == 200:
+        html = resp_page.text
+        if cache is not None and cache.get("sha256") == hashlib.sha256(html.encode('utf-8')).hexdigest():
+            logging.info("Page content unchanged, skipping parsing.")
+            page = cache["page"]
+        else:
+            page = parse_page(html, day)
+        save_page_cache(year, day, html, resp_page.headers, page)
+    else:
+        logging.error(f"Error {resp_page.status_code}. Exiting...")
+        sys.exit(1)
         
     # 4. Input Download
     input_data = ""
-    input_path = DATA_FOLDER / f"{year}-{day:02d}.in"
+    input_path = data_folder() / f"{year}-{day:02d}.in"
     if not input_path.exists():
         input_url = f"{base_url}/input"
-        resp_input = requests.get(input_url, headers=HEADERS)
+        try:
+            RATE_LIMITER.wait()
+            resp_input = get_http_session().get(input_url, timeout=http_timeout())
+        except requests.RequestException as e:
+            logging.error(f"Network error: {e}. Exiting...")
+            sys.exit(1)
         if resp_input.status_code == 200:
             input_data = resp_input.text
 
     return {
-        "title_sanitized": title_sanitized,
-        "title_clean": title_clean,
-        "status": status,
-        "description": full_markdown,
+        **page,
         "input_data": input_data
     }
 
-def setup_files(year, day):
+def find_local_files(year, day) -> tuple[Path, Path] | None:
+    """
+    Return (description, script) if the day is already fully set up on disk:
+    input, script and a description that already contains both parts
+    """
+    input_path = data_folder() / f"{year}-{day:02d}.in"
+    if not input_path.exists():
+        return None
+    
+    for desc_path in Path(str(year)).glob(f"{day:02d}-*-description.md"):
+        py_path = desc_path.with_name(desc_path.name.replace("-description.md", ".py"))
+        if not py_path.exists():
+            continue
+        with open(desc_path, "r", encoding="utf-8") as f:
+            if "## Part Two" in f.read():
+                return desc_path, py_path
+    return None
+
+def setup_files(year, day, refresh: bool = False):
+    # --- 0. Offline fast path ---
+    if not refresh:
+        local_files = find_local_files(year, day)
+        if local_files is not None:
+            desc_path, py_path = local_files
+            cache = load_page_cache(year, day)
+            logging.info(f"Day already set up, at '{desc_path}' and '{py_path}' (use --refresh to fetch it again)")
+            return py_path, cache["page"]["status"] if cache is not None else "LOCAL"
+    
     data = get_page_data(year, day)
     
     # Make directories
-    os.makedirs(DATA_FOLDER, exist_ok=True)
+    os.makedirs(data_folder(), exist_ok=True)
     day_folder = str(year)
     os.makedirs(day_folder, exist_ok=True)
     
     # --- 1. Save Input File ---
     if data["input_data"]:
-        input_path = DATA_FOLDER / f"{year}-{day:02d}.in"
+        input_path = data_folder() / f"{year}-{day:02d}.in"
         with open(input_path, "w") as f:
             f.write(data["input_data"])
         logging.info(f"Saved input file to '{input_path}'")
@@ -218,7 +429,7 @@ def setup_files(year, day):
         input_name = f"{year}-{day:02d}.in"
         
         # Load the template from a file
-        with open(TEMPLATE_FILE, 'r') as f:
+        with open(template_file(), 'r') as f:
             template_src = Template(f.read())
             
         filled_content = template_src.safe_substitute({
@@ -226,7 +437,7 @@ def setup_files(year, day):
             'day_padded': f"{day:02}",
             'title_clean': data['title_clean'].title(),
             'desc_path': desc_path,
-            'data_folder': DATA_FOLDER,
+            'data_folder': data_folder(),
             'input_name': input_name,
         })
         with open(py_path, "w") as f:
@@ -239,6 +450,8 @@ def setup_files(year, day):
 
 def submit_answer(year, day, level, answer):
     """Invia la soluzione al server e parsa la risposta."""
+    import requests
+    from bs4 import BeautifulSoup
     url = f"https://adventofcode.com/{year}/day/{day}/answer"
     payload = {
         "level": level,
@@ -247,7 +460,12 @@ def submit_answer(year, day, level, answer):
     
     logging.info(f"Submitting Level {level}: {answer}")
     
-    resp = requests.post(url, data=payload, headers=HEADERS)
+    try:
+        RATE_LIMITER.wait()
+        resp = get_http_session().post(url, data=payload, timeout=http_timeout())
+    except requests.RequestException as e:
+        logging.error(f"Network error during submission: {e}")
+        return False
     
     if resp.status_code != 200:
         logging.error(f"HTTP Error {resp.status_code} during submission.")
@@ -260,6 +478,7 @@ def submit_answer(year, day, level, answer):
     
     if "That's the right answer" in text:
         logging.info(f"Correct answer! Level {level} completed.")
+        invalidate_page_cache(year, day) # The page now shows the next part
         return True
     elif "not the right answer" in text:
         if "too high" in text:
@@ -283,17 +502,124 @@ def submit_answer(year, day, level, answer):
         logging.error(f"Unknown responses: {text}")
     return False # Fallback
 
-def run_and_submit(year, day):
-    # 1. Run the setup to check if file exists, and also get the problem status
-    script_path, status = setup_files(year, day)
+@dataclass
+class SolutionResult:
+    sol1: str | None
+    sol2: str | None
+    timings: dict[str, float] = field(default_factory=dict) # Seconds per phase ('parse', 'part1', 'part2')
+    cached: bool = False # Taken from the AnswerCache, not computed
+
+def input_path_for(script_path: Path) -> Path:
+    """ Input file of a day script, e.g. 2025/01-secret-entrance.py -> data/2025-01.in """
+    script_path = Path(script_path)
+    return data_folder() / f"{script_path.parent.name}-{script_path.name[:2]}.in"
+
+class AnswerCache:
+    """
+    LRU cache of the solutions, keyed by the hash of the script source plus the input bytes:
+    a day is computed again only if one of the two changed. Saved as JSON in the data folder
+    """
+    def __init__(self, path: Path, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self.entries: dict[str, dict] = {} # Least recently used first
+        if path.exists():
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                logging.warning(f"Corrupted answer cache '{path}', ignoring it.")
     
-    if status == "COMPLETED":
-        logging.info("Problem already fully completed! No submission needed.")
-        return
+    @staticmethod
+    def key(script_path: Path) -> str | None:
+        input_path = input_path_for(script_path)
+        if not input_path.exists():
+            return None
+        digest = hashlib.sha256()
+        with open(script_path, 'rb') as f:
+            digest.update(f.read())
+        digest.update(b"\0")
+        with open(input_path, 'rb') as f:
+            digest.update(f.read())
+        return digest.hexdigest()
+    
+    def get(self, script_path: Path) -> SolutionResult | None:
+        key = self.key(script_path)
+        if key is None or key not in self.entries:
+            return None
+        entry = self.entries.pop(key)
+        self.entries[key] = entry # Move to the most recently used position
+        return SolutionResult(sol1=entry["sol1"], sol2=entry["sol2"], timings=entry["timings"], cached=True)
+    
+    def put(self, script_path: Path, result: SolutionResult):
+        key = self.key(script_path)
+        if key is None:
+            return
+        self.entries.pop(key, None)
+        self.entries[key] = {
+            "script": Path(script_path).as_posix(),
+            "sol1": result.sol1,
+            "sol2": result.sol2,
+            "timings": result.timings,
+        }
+        while len(self.entries) > self.max_entries: # Evict the least recently used
+            del self.entries[next(iter(self.entries))]
+    
+    def save(self):
+        os.makedirs(self.path.parent, exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=2)
 
-    logging.info(f"Running solution script: {script_path}")
+def open_answer_cache() -> AnswerCache:
+    max_entries = get_config().getint('CACHE', 'max_entries', fallback=64)
+    return AnswerCache(data_folder() / 'answers-cache.json', max_entries)
+
+def load_solution_module(script_path: Path):
+    """ Import a day script as a module (its __main__ block is not executed) """
+    module_name = "aoc_" + re.sub(r"\W", "_", Path(script_path).stem)
+    spec = importlib.util.spec_from_file_location(module_name, script_path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module # Needed to pickle its functions (e.g. for a process pool inside the script)
+    spec.loader.exec_module(module)
+    return module
+
+def run_in_process(script_path: Path, input_file: str | None = None) -> SolutionResult | None:
+    """
+    Load the script with importlib and call parse_input, solve_part1 and solve_part2 directly.
+    No new interpreter is started, and every phase is timed
+    """
+    try:
+        module = load_solution_module(script_path)
+        use_file = input_file if input_file is not None else module.INPUT_FILE
+        timings: dict[str, float] = {}
+        
+        start_time = time.perf_counter()
+        data = module.parse_input(use_file)
+        timings["parse"] = time.perf_counter() - start_time
+        
+        start_time = time.perf_counter()
+        sol1 = module.solve_part1(data)
+        timings["part1"] = time.perf_counter() - start_time
+        
+        start_time = time.perf_counter()
+        sol2 = module.solve_part2(data)
+        timings["part2"] = time.perf_counter() - start_time
+    except Exception:
+        logging.exception(f"Script '{script_path}' failed")
+        return None
     
-    # 2. Run the python script
+    return SolutionResult(
+        sol1=str(sol1) if sol1 is not None else None,
+        sol2=str(sol2) if sol2 is not None else None,
+        timings=timings,
+    )
+
+def run_in_subprocess(script_path: Path) -> SolutionResult | None:
+    """
+    Run the script in a new interpreter and read the AOC_SOL_x markers from stdout.
+    Slower, but fully isolated from the manager
+    """
+    start_time = time.perf_counter()
     try:
         result = subprocess.run(
             [sys.executable, script_path], 
@@ -303,55 +629,436 @@ def run_and_submit(year, day):
         )
     except subprocess.CalledProcessError as e:
         logging.error(f"Script failed with error:\n{e.stderr}")
-        return
+        return None
+    elapsed = time.perf_counter() - start_time
 
-    # 3. Get the solutions
     output = result.stdout
     sol1_match = re.search(r"AOC_SOL_1=(.+)", output)
     sol2_match = re.search(r"AOC_SOL_2=(.+)", output)
     
+    time_match = re.search(r"AOC_TIME=(.+)", output)
+    
     sol1 = sol1_match.group(1).strip() if sol1_match else None
     sol2 = sol2_match.group(1).strip() if sol2_match else None
 
     if not sol1 and not sol2:
         logging.warning("No solution markers found in stdout (AOC_SOL_x).")
         logging.info("Stdout was:\n" + output)
+        return None
+    
+    # Per-phase timings from the script (template v2.2+), otherwise the process wall time
+    timings = {"total": elapsed}
+    if time_match:
+        try:
+            script_timings = json.loads(time_match.group(1))
+            timings = {phase: script_timings[key] / 1e9 for phase, key in (("parse", "parse"), ("part1", "p1"), ("part2", "p2"))}
+        except (json.JSONDecodeError, KeyError, TypeError):
+            logging.warning(f"Malformed timing marker: {time_match.group(0)}")
+    return SolutionResult(sol1=sol1, sol2=sol2, timings=timings)
+
+def record_timing_history(script_path: Path, result: SolutionResult, mode: str):
+    """ Append the timings of a run to the history file """
+    os.makedirs(data_folder(), exist_ok=True)
+    entry = {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "script": Path(script_path).as_posix(),
+        "mode": mode,
+        "timings": result.timings,
+    }
+    with open(timing_history_file(), 'a', encoding='utf-8') as f:
+        f.write(json.dumps(entry) + "\n")
+
+def run_and_submit(year, day, isolated: bool = False, use_cache: bool = True):
+    # 1. Run the setup to check if file exists, and also get the problem status
+    script_path, status = setup_files(year, day, refresh=True) # The status must come from the server
+    
+    if status == "COMPLETED":
+        logging.info("Problem already fully completed! No submission needed.")
         return
 
-    logging.info(f"Found Solutions => Part 1: {sol1}, Part 2: {sol2}")
+    logging.info(f"Running solution script: {script_path} ({'subprocess' if isolated else 'in-process'})")
+    
+    # 2. Run the solution and get the answers (unless script and input are unchanged)
+    cache = open_answer_cache() if use_cache else None
+    result = cache.get(script_path) if cache is not None else None
+    if result is None:
+        result = run_in_subprocess(script_path) if isolated else run_in_process(script_path)
+        if result is None:
+            return
+        record_timing_history(script_path, result, "subprocess" if isolated else "in-process")
+        if cache is not None:
+            cache.put(script_path, result)
+            cache.save()
+    sol1, sol2 = result.sol1, result.sol2
+
+    logging.info(f"Found Solutions{' (cached)' if result.cached else ''} => Part 1: {sol1}, Part 2: {sol2}")
+    logging.info("Timings => " + ", ".join(f"{phase}: {t:.4f}s" for phase, t in result.timings.items()))
 
-    # 4. Send solution based on the challenge status
+    # 3. Send solution based on the challenge status
     if status == "PART1":
         success = submit_answer(year, day, 1, sol1)
         if success:
             logging.info("Fetching Part 2 description...")
-            setup_files(year, day) 
+            setup_files(year, day, refresh=True)
     elif status == "PART2":
         submit_answer(year, day, 2, sol2)
     else:
         logging.error(f"Unknown status: {status}")
 
+def event_days(year: int) -> int:
+    """ Number of puzzles in the event (12 since 2025) """
+    return 12 if year >= 2025 else 25
+
+def parse_days(days_spec: str) -> list[int]:
+    """ Parse a day list such as '1-25' or '1,3,5-7' """
+    days: set[int] = set()
+    for part in days_spec.split(','):
+        part = part.strip()
+        if '-' in part:
+            first, last = map(int, part.split('-'))
+            days.update(range(first, last + 1))
+        else:
+            days.add(int(part))
+    return sorted(days)
+
+def setup_many(year: int, days: list[int], workers: int, refresh: bool = False) -> list[dict]:
+    """
+    Run setup_files for every day on a thread pool. Requests are throttled by RATE_LIMITER
+    """
+    def setup_one(day: int) -> dict:
+        start_time = time.perf_counter()
+        try:
+            py_path, status = setup_files(year, day, refresh)
+        except (Exception, SystemExit) as e: # get_page_data exits on HTTP errors
+            return {"day": day, "path": None, "status": f"FAILED ({e})", "elapsed": time.perf_counter() - start_time}
+        return {"day": day, "path": py_path, "status": status, "elapsed": time.perf_counter() - start_time}
+    
+    results: list[dict] = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(setup_one, day) for day in days]
+        for future in as_completed(futures):
+            results.append(future.result())
+    return sorted(results, key=lambda r: r["day"])
+
+def print_setup_summary(year: int, results: list[dict], total_elapsed: float):
+    print(f"\n--- Setup summary {year} ---")
+    for r in results:
+        path = r["path"] if r["path"] is not None else "-"
+        print(f"Day {r['day']:02d}  {r['elapsed']:7.3f}s  {r['status']:<10}  {path}")
+    print(f"Total: {len(results)} days in {total_elapsed:.3f}s")
+
+def discover_scripts(year: int) -> list[Path]:
+    """ All the day scripts of an event, e.g. 2025/01-secret-entrance.py """
+    return sorted(Path(str(year)).glob("[0-9][0-9]-*.py"))
+
+def load_timings() -> dict[str, dict[str, float]]:
+    path = timings_file()
+    if not path.exists():
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        logging.warning(f"Corrupted timings file '{path}', ignoring it.")
+        return {}
+
+def save_timings(timings: dict[str, dict[str, float]]):
+    os.makedirs(data_folder(), exist_ok=True)
+    with open(timings_file(), 'w', encoding='utf-8') as f:
+        json.dump(timings, f, indent=2)
+
+def run_script(script_path: Path) -> tuple[Path, SolutionResult | None]:
+    """ Worker for run_all (top-level, so it can be pickled) """
+    return script_path, run_in_process(script_path)
+
+def run_all(year: int, workers: int | None = None, use_cache: bool = True) -> list[tuple[Path, SolutionResult | None]]:
+    """
+    Run every script of the event on a process pool. The slowest days of the previous
+    run are submitted first (longest-job-first), days never timed before go in front.
+    Days whose script and input didn't change are taken from the AnswerCache
+    """
+    scripts = discover_scripts(year)
+    if not scripts:
+        logging.error(f"No scripts found in '{year}/'.")
+        return []
+    
+    results: list[tuple[Path, SolutionResult | None]] = []
+    cache = open_answer_cache() if use_cache else None
+    if cache is not None:
+        to_run: list[Path] = []
+        for script_path in scripts:
+            result = cache.get(script_path)
+            if result is not None:
+                results.append((script_path, result))
+            else:
+                to_run.append(script_path)
+        logging.info(f"{len(results)} scripts found in the answer cache")
+        scripts = to_run
+    
+    timings = load_timings()
+    def expected_time(script_path: Path) -> float:
+        previous = timings.get(script_path.as_posix())
+        return sum(previous.values()) if previous else float('inf')
+    scripts.sort(key=expected_time, reverse=True)
+    
+    workers = workers or os.cpu_count() or 1
+    logging.info(f"Running {len(scripts)} scripts on {workers} processes")
+    
+    if scripts:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(run_script, script_path) for script_path in scripts]
+            for future in as_completed(futures):
+                script_path, result = future.result()
+                results.append((script_path, result))
+                if result is not None:
+                    timings[script_path.as_posix()] = result.timings
+                    record_timing_history(script_path, result, "run-all")
+                    if cache is not None:
+                        cache.put(script_path, result)
+    
+    save_timings(timings)
+    if cache is not None:
+        cache.save()
+    return sorted(results, key=lambda r: r[0].name)
+
+def print_run_all_table(year: int, results: list[tuple[Path, SolutionResult | None]], wall_time: float):
+    print(f"\n--- Run all {year} ---")
+    print(f"{'Script':<32} {'Part 1':>18} {'Part 2':>18} {'parse':>9} {'part1':>9} {'part2':>9} {'total':>9}")
+    nan = float('nan')
+    cpu_time = 0.0
+    for script_path, result in results:
+        if result is None:
+            print(f"{script_path.stem:<32} {'FAILED':>18}")
+            continue
+        t = result.timings
+        total = sum(t.values())
+        if not result.cached:
+            cpu_time += total
+        print(f"{script_path.stem:<32} {str(result.sol1):>18} {str(result.sol2):>18} "
+              f"{t.get('parse', nan):8.3f}s {t.get('part1', nan):8.3f}s {t.get('part2', nan):8.3f}s {total:8.3f}s"
+              f"{'  (cached)' if result.cached else ''}")
+    print(f"Wall time: {wall_time:.3f}s (sum of all the days: {cpu_time:.3f}s)")
+
+BENCH_PHASES = ("parse", "part1", "part2")
+
+def benchmark_script(script_path: Path, repeat: int, warmup: int) -> dict[str, list[int]]:
+    """
+    Time parse_input, solve_part1 and solve_part2 `repeat` times (after `warmup` untimed runs).
+    The input is parsed again at every round, since some solvers modify their data
+    """
+    module = load_solution_module(script_path)
+    samples: dict[str, list[int]] = {phase: [] for phase in BENCH_PHASES}
+    
+    for i in range(warmup + repeat):
+        t0 = time.perf_counter_ns()
+        data = module.parse_input(module.INPUT_FILE)
+        t1 = time.perf_counter_ns()
+        module.solve_part1(data)
+        t2 = time.perf_counter_ns()
+        module.solve_part2(data)
+        t3 = time.perf_counter_ns()
+        
+        if i >= warmup:
+            samples["parse"].append(t1 - t0)
+            samples["part1"].append(t2 - t1)
+            samples["part2"].append(t3 - t2)
+    return samples
+
+def summarize_samples(samples_ns: list[int]) -> dict[str, float]:
+    ordered = sorted(samples_ns)
+    return {
+        "median_ns": statistics.median(ordered),
+        "p95_ns": ordered[math.ceil(0.95 * len(ordered)) - 1], # Nearest rank
+        "stddev_ns": statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+        "min_ns": ordered[0],
+        "runs": len(ordered),
+    }
+
+def run_benchmark(year: int, days: list[int] | None, repeat: int, warmup: int) -> dict:
+    scripts = discover_scripts(year)
+    if days is not None:
+        scripts = [s for s in scripts if int(s.name[:2]) in days]
+    
+    results: dict[str, dict[str, dict[str, float]]] = {}
+    for script_path in scripts:
+        logging.info(f"Benchmarking {script_path} ({warmup} warmup + {repeat} runs)")
+        try:
+            samples = benchmark_script(script_path, repeat, warmup)
+        except Exception:
+            logging.exception(f"Benchmark of '{script_path}' failed")
+            continue
+        results[script_path.stem] = {phase: summarize_samples(samples[phase]) for phase in BENCH_PHASES}
+    
+    return {"year": year, "repeat": repeat, "warmup": warmup, "python": sys.version.split()[0], "results": results}
+
+def print_benchmark(report: dict):
+    print(f"\n--- Benchmark {report['year']} ({report['repeat']} runs, {report['warmup']} warmup) ---")
+    print(f"{'Script':<32} {'Phase':<6} {'median':>11} {'p95':>11} {'stddev':>11}")
+    for script, phases in report["results"].items():
+        for phase, stats in phases.items():
+            print(f"{script:<32} {phase:<6} {stats['median_ns'] / 1e6:9.3f}ms {stats['p95_ns'] / 1e6:9.3f}ms {stats['stddev_ns'] / 1e6:9.3f}ms")
+
+def compare_benchmarks(report: dict, baseline: dict, threshold: float, min_delta_ns: int = 0) -> list[str]:
+    """
+    Return a message for every phase whose median got slower than the baseline by more than `threshold` (e.g. 0.1 = 10%)
+    and by more than `min_delta_ns` nanoseconds (0: any slowdown over the threshold is reported)
+    """
+    regressions: list[str] = []
+    for script, phases in report["results"].items():
+        for phase, stats in phases.items():
+            old = baseline.get("results", {}).get(script, {}).get(phase)
+            if old is None:
+                continue
+            old_median, new_median = old["median_ns"], stats["median_ns"]
+            if new_median > old_median * (1 + threshold) and new_median - old_median > min_delta_ns:
+                change = (new_median / old_median - 1) * 100 if old_median else float('inf')
+                regressions.append(f"{script} {phase}: {old_median / 1e6:.3f}ms -> {new_median / 1e6:.3f}ms (+{change:.1f}%)")
+    return regressions
+
+def import_times(code: str) -> list[tuple[str, int]]:
+    """
+    Run `code` in a fresh interpreter with `-X importtime`.
+    Return the top-level imports as (module, cumulative us)
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True)
+    top_level: list[tuple[str, int]] = []
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|( +)(\S+)", line)
+        if match and len(match.group(2)) == 1: # A single space: imported by the script, not by another module
+            top_level.append((match.group(3), int(match.group(1))))
+    return top_level
+
+def startup_profile(top: int = 10):
+    """
+    Report the manager startup cost from `python -X importtime`, and the cost of the
+    dependencies that are only imported on first use
+    """
+    baseline = {name for name, _ in import_times("import runpy")} # Interpreter startup + runpy itself
+    
+    start_time = time.perf_counter()
+    manager = import_times(f"import runpy; runpy.run_path({str(Path(__file__).resolve())!r}, run_name='aoc_manager')")
+    wall_time = time.perf_counter() - start_time
+    manager = [(name, us) for name, us in manager if name not in baseline]
+    
+    deferred = [(name, us) for name, us in import_times("import requests, bs4, configparser") if name not in baseline]
+    
+    print("--- Startup profile ---")
+    print(f"Manager imports: {sum(us for _, us in manager) / 1000:.1f}ms (process wall time {wall_time * 1000:.1f}ms)")
+    for name, us in sorted(manager, key=lambda m: m[1], reverse=True)[:top]:
+        print(f"  {us / 1000:8.1f}ms  {name}")
+    print(f"Deferred until first use: {sum(us for _, us in deferred) / 1000:.1f}ms")
+    for name, us in sorted(deferred, key=lambda m: m[1], reverse=True):
+        print(f"  {us / 1000:8.1f}ms  {name}")
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "run-all":
+        parser = argparse.ArgumentParser(prog="aoc-manager.py run-all", description="Run every solution of an event in parallel")
+        parser.add_argument("--year", type=int, required=True, help="Year of the event (e.g., 2025)")
+        parser.add_argument("--workers", type=int, default=None, help="Number of processes (default: number of cores)")
+        parser.add_argument("--no-cache", action="store_true", help="Run every script, even if script and input didn't change")
+        args = parser.parse_args(sys.argv[2:])
+        
+        logging.info(f"--- AoC Manager: Run all {args.year} ---")
+        start_time = time.perf_counter()
+        results = run_all(args.year, args.workers, not args.no_cache)
+        print_run_all_table(args.year, results, time.perf_counter() - start_time)
+        sys.exit(0 if results and all(r is not None for _, r in results) else 1)
+    
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        parser = argparse.ArgumentParser(prog="aoc-manager.py bench", description="Benchmark the solutions of an event")
+        parser.add_argument("--year", type=int, required=True, help="Year of the event (e.g., 2025)")
+        parser.add_argument("--days", type=str, default=None, help="Only these days (e.g., '8,9,12' or '1-5')")
+        parser.add_argument("-n", "--repeat", type=int, default=10, help="Timed runs per script (default: 10)")
+        parser.add_argument("--warmup", type=int, default=1, help="Untimed runs before measuring (default: 1)")
+        parser.add_argument("-o", "--output", type=str, default=None, help="Save the results to this JSON file")
+        parser.add_argument("--compare", type=str, default=None, help="Baseline JSON file (from --output) to check for regressions")
+        parser.add_argument("--threshold", type=float, default=0.10, help="Relative slowdown reported as regression (default: 0.10)")
+        parser.add_argument("--min-delta-ms", type=float, default=0, help="Ignore slowdowns smaller than this many milliseconds, to filter out noise (default: 0)")
+        args = parser.parse_args(sys.argv[2:])
+        
+        if args.repeat < 1:
+            logging.error("--repeat must be at least 1.")
+            sys.exit(1)
+        
+        report = run_benchmark(args.year, parse_days(args.days) if args.days else None, args.repeat, args.warmup)
+        print_benchmark(report)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            logging.info(f"Benchmark saved to '{args.output}'")
+        
+        if args.compare:
+            with open(args.compare, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+            regressions = compare_benchmarks(report, baseline, args.threshold, round(args.min_delta_ms * 1e6))
+            for message in regressions:
+                logging.warning(f"Regression: {message}")
+            if regressions:
+                sys.exit(1)
+            logging.info(f"No regressions against '{args.compare}' (threshold {args.threshold:.0%}, min delta {args.min_delta_ms}ms)")
+        sys.exit(0)
+    
     parser = argparse.ArgumentParser(description="Advent of Code Manager")
     
-    parser.add_argument("year", type=int, help="Year of the event (e.g., 2023)")
-    parser.add_argument("day", type=int, help="Day of the problem (1-25)")
+    parser.add_argument("year", type=int, nargs='?', help="Year of the event (e.g., 2023)")
+    parser.add_argument("day", type=int, nargs='?', help="Day of the problem (1-25)")
     parser.add_argument("--submit", action="store_true", help="Run the solution and submit the answer")
+    parser.add_argument("--isolated", action="store_true", help="With --submit, run the solution in a separate interpreter instead of in-process")
+    parser.add_argument("--no-cache", action="store_true", help="With --submit, run the solution even if script and input didn't change")
+    parser.add_argument("--days", type=str, help="Setup several days at once (e.g., '1-25' or '1,3,5-7')")
+    parser.add_argument("--year-all", action="store_true", help="Setup every day of the event")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent downloads for --days/--year-all (default: 4)")
+    parser.add_argument("--rate", type=float, default=None, help="Max requests per second to the server (default: requests_per_second in config.ini, or 1)")
+    parser.add_argument("--refresh", action="store_true", help="Fetch the page again even if every file is already on disk")
+    parser.add_argument("--startup-profile", action="store_true", help="Report the startup time of the manager (python -X importtime) and exit")
 
     args = parser.parse_args()
+    bulk = args.days is not None or args.year_all
+    
+    if args.startup_profile:
+        startup_profile()
+        sys.exit(0)
 
     # Basic input validation
-    if not (1 <= args.day <= 25):
-        logging.error("Day must be between 1 and 25.")
+    if args.year is None:
+        logging.error("Missing year.")
         sys.exit(1)
     
     if args.year < 2015:
         logging.error("Advent of Code started in 2015.")
         sys.exit(1)
+    
+    if bulk and (args.day is not None or args.submit):
+        logging.error("--days/--year-all can't be used with a single day or with --submit.")
+        sys.exit(1)
+    
+    if not bulk and args.day is None:
+        logging.error("Missing day (or use --days/--year-all).")
+        sys.exit(1)
+    
+    if args.year_all:
+        days = list(range(1, event_days(args.year) + 1))
+    elif args.days is not None:
+        days = parse_days(args.days)
+    else:
+        days = [args.day]
+    if not all(1 <= d <= 25 for d in days):
+        logging.error("Day must be between 1 and 25.")
+        sys.exit(1)
+    
+    if args.rate is not None:
+        RATE_LIMITER.set_rate(args.rate)
+    
+    if bulk:
+        logging.info(f"--- AoC Manager: Days {days[0]}-{days[-1]} Year {args.year} ---")
+        start_time = time.perf_counter()
+        results = setup_many(args.year, days, args.workers, args.refresh)
+        print_setup_summary(args.year, results, time.perf_counter() - start_time)
+        sys.exit(0 if all(r["path"] is not None for r in results) else 1)
 
     logging.info(f"--- AoC Manager: Day {args.day} Year {args.year} ---")
     
     if args.submit:
-        run_and_submit(args.year, args.day)
+        run_and_submit(args.year, args.day, args.isolated, not args.no_cache)
     else:
-        setup_files(args.year, args.day)
\ No newline at end of file
+        setup_files(args.year, args.day, args.refresh)
@@ -0,0 +1,36 @@
+import importlib.util
+import os
+
+import pytest
+
+SCRIPT = os.path.join(os.path.dirname(__file__), '..', '2025', '05-cafeteria.py')
+
+@pytest.fixture(scope='module')
+def cafeteria():
+    spec = importlib.util.spec_from_file_location('cafeteria', SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+@pytest.fixture(scope='module')
+def index(cafeteria):
+    # 3-5 and 10-14 (merged with 12-18 into 10-18), plus the one-point range 20-20
+    return cafeteria.range_starts_ends(cafeteria.compact_list([(3, 5), (10, 14), (12, 18), (20, 20)]))
+
+CASES = [
+    (2, False), (3, True), (5, True), (6, False), # Just outside, on the start, on the end, just outside
+    (9, False), (10, True), (18, True), (19, False), # Same around a merged range
+    (20, True), (21, False), # One-point range
+]
+
+@pytest.mark.parametrize('ingredient, fresh', CASES)
+def test_is_fresh_boundaries(cafeteria, index, ingredient, fresh):
+    assert cafeteria.is_fresh(ingredient, *index) == fresh
+
+@pytest.mark.parametrize('ingredient, fresh', CASES)
+def test_count_fresh_numpy_boundaries(cafeteria, index, ingredient, fresh):
+    assert cafeteria.count_fresh_numpy([ingredient], *index) == int(fresh)
+
+def test_count_fresh_numpy_batch(cafeteria, index):
+    ingredients = [ingredient for ingredient, _ in CASES]
+    assert cafeteria.count_fresh_numpy(ingredients, *index) == sum(fresh for _, fresh in CASES)